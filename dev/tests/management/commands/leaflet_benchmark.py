@@ -0,0 +1,225 @@
+import decimal
+import functools
+import json
+import operator
+import random
+import time
+import tracemalloc
+from unittest import mock
+
+from tests.models import Building, DeliveryJob, Waypoint
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.gis.geos import GeometryCollection, Point
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from leaflet_admin_list import __version__
+from leaflet_admin_list.compact import decode_feature_list
+from leaflet_admin_list.encoder import dumps
+from leaflet_admin_list.filters import BoundingBoxFilter
+
+
+#: the area where synthetic objects are scattered, the same as of the test data
+CENTER = (50, 50)
+#: the bounding box of the map view used to measure filtering, about 1% of the area
+BBOX = '49.9,49.9,50.1,50.1'
+#: benchmarked models by the model name
+MODELS = {m._meta.model_name: m for m in (Waypoint, DeliveryJob, Building)}
+
+
+def legacy_feature_list(model_admin, request, queryset):
+    '''the quadratic feature list assembly used before the feature iterator has been introduced'''
+    return json.dumps({
+        'type': 'FeatureCollection',
+        'features': functools.reduce(operator.add, (model_admin.get_geojson_features(request, o, queryset) for o in queryset), []),
+    })
+
+
+def random_point():
+    return Point(CENTER[0] + random.uniform(-1, 1), CENTER[1] + random.uniform(-1, 1), srid=4326)
+
+
+def random_building():
+    '''returns a building footprint of a random size and complexity, sometimes consisting of several parts'''
+    return GeometryCollection([
+        random_point().buffer(random.uniform(0.0002, 0.002), quadsegs=random.choice([1, 2, 8, 32]))
+        for i in range(random.choice([1, 1, 1, 2, 3]))
+    ], srid=4326)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the changelist map rendering on synthetic data'
+
+    #: functions creating a synthetic instance number `i`, by the model name
+    factories = {
+        'waypoint': lambda i: Waypoint(
+            name='Waypoint Benchmark %s' % i,
+            waypoint=random_point(),
+        ),
+        'deliveryjob': lambda i: DeliveryJob(
+            name='Delivery Benchmark %s' % i,
+            quantity=random.randint(1, 100),
+            weight=random.uniform(1, 1000),
+            price=decimal.Decimal(random.randint(100, 100000)) / 100,
+            kind=random.choice(['wood', 'steel', 'oil']),
+            pickup_point=random_point(),
+            dropoff_point=random_point(),
+        ),
+        'building': lambda i: Building(
+            name='Building Benchmark %s' % i,
+            levels=random.randint(1, 30),
+            geometry=random_building(),
+        ),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000], help='Numbers of rows to benchmark')
+        parser.add_argument('--models', nargs='+', choices=list(MODELS), default=list(MODELS), help='Models to benchmark')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the synthetic data')
+        parser.add_argument('--keep', action='store_true', help='Keep synthetic objects to look at them in the browser')
+        parser.add_argument('--json', metavar='PATH', help='Write results as JSON to the file, "-" for the standard output')
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        self.results = []
+        # the standard output is kept for the JSON report if requested
+        self.out = self.stderr if options['json'] == '-' else self.stdout
+        for name in options['models']:
+            model_admin = admin.site._registry[MODELS[name]]
+            for rows in options['rows']:
+                with transaction.atomic():
+                    self.populate(model_admin.model, name, rows)
+                    self.benchmark(model_admin, rows)
+                    transaction.set_rollback(not options['keep'])
+        if options['json']:
+            report = json.dumps({
+                'version': __version__,
+                'database': connections[DEFAULT_DB_ALIAS].vendor,
+                'seed': options['seed'],
+                'results': self.results,
+            }, indent=2)
+            if options['json'] == '-':
+                self.stdout.write(report)
+            else:
+                with open(options['json'], 'w') as f:
+                    f.write(report)
+
+    def populate(self, model, name, rows, batch_size=10000):
+        '''creates `rows` synthetic objects of the `model` scattered around the same area as the test data'''
+        for start in range(0, rows, batch_size):
+            model.objects.bulk_create([self.factories[name](i) for i in range(start, min(rows, start + batch_size))])
+
+    def benchmark(self, model_admin, rows):
+        '''measures the changelist map rendering of the `model_admin` with `rows` objects'''
+        self.model = model_admin.model
+        self.user = User.objects.get_or_create(username='leaflet_benchmark', defaults={'is_superuser': True, 'is_staff': True})[0]
+        client = Client()
+        client.force_login(self.user)
+        url = '/admin/%s/%s/' % (self.model._meta.app_label, self.model._meta.model_name)
+        request = RequestFactory().get('/')
+        request.user = self.user
+        queryset = self.model.objects.all()
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            self.measure(rows, 'changelist', lambda: self.content(client.get(url)))
+            self.measure(rows, 'changelist bbox', lambda: self.content(client.get(url, {'bounding_box': BBOX})))
+            self.measure(rows, 'geojson viewport', lambda: self.content(client.get(url + 'geojson/', {'map_bbox': BBOX, 'map_zoom': 10})))
+        spec = next(f for f in model_admin.get_list_filter(request) if isinstance(f, type) and issubclass(f, BoundingBoxFilter))
+        spec = spec(request, {}, self.model, model_admin)
+        self.measure(rows, 'bbox filter', lambda: len(spec.filter_bbox(request, queryset, spec.get_bbox(BBOX)).values_list('pk')))
+
+        if rows <= 10000:
+            self.measure(rows, 'legacy list', lambda: legacy_feature_list(model_admin, request, queryset))
+        self.measure(rows, 'feature list', lambda: dumps(model_admin.get_geojson_feature_list(request, queryset)))
+        self.measure_features(rows, 'features', model_admin, request, queryset)
+        with mock.patch.object(model_admin, 'get_geojson_context', model_admin.create_geojson_context):
+            # resolves the per-request data for every feature as it has been done before
+            self.measure_features(rows, 'features uncached', model_admin, request, queryset)
+        self.measure(rows, 'stream', lambda: sum(len(c) for c in model_admin.get_geojson_feature_list_chunks(request, queryset)))
+        with mock.patch.object(model_admin, 'geojson_database_side', True):
+            self.measure(rows, 'stream database', lambda: sum(
+                len(c) for c in model_admin.get_geojson_feature_list_chunks(request, model_admin.get_geojson_queryset(request, queryset))
+            ))
+        self.measure_compact(rows, model_admin, request, queryset)
+        if self.model is Building:
+            self.measure_simplify(rows, model_admin, queryset)
+        for z, x, y in [(0, 0, 0), (6, 40, 21), (12, 2616, 1386)]:
+            self.measure(rows, 'tile %s/%s/%s' % (z, x, y), lambda: model_admin.get_tile(request, queryset, z, x, y))
+
+    def content(self, response):
+        if response.status_code != 200:
+            raise CommandError('Unexpected response status %s' % response.status_code)
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def measure_compact(self, rows, model_admin, request, queryset):
+        '''measures the size and the decoding time of the compact feature list against the GeoJSON one'''
+        text = ''.join(model_admin.get_geojson_feature_list_chunks(request, queryset))
+        with mock.patch.object(model_admin, 'geojson_format', 'compact'):
+            compact = self.measure(rows, 'compact', lambda: ''.join(model_admin.get_geojson_feature_list_chunks(request, queryset)))
+
+        def decode_geojson():
+            json.loads(text)
+            return len(text)
+
+        def decode_compact():
+            decode_feature_list(json.loads(compact))
+            return len(compact)
+
+        self.measure(rows, 'decode geojson', decode_geojson)
+        self.measure(rows, 'decode compact', decode_compact)
+
+    def measure_simplify(self, rows, model_admin, queryset):
+        '''measures the feature list size of complex polygons with and without simplification and rounding'''
+        for zoom in (8, 12, 16):
+            request = RequestFactory().get('/')
+            request.user = self.user
+            model_admin.get_geojson_context(request, queryset).zoom = zoom
+            self.measure(rows, 'polygons z%s' % zoom, lambda: dumps(model_admin.get_geojson_feature_list(request, queryset)))
+            with mock.patch.object(model_admin, 'geojson_simplify', 1), mock.patch.object(model_admin, 'geojson_precision', 6):
+                self.measure(rows, 'simplified z%s' % zoom, lambda: dumps(model_admin.get_geojson_feature_list(request, queryset)))
+
+    def measure_features(self, rows, name, model_admin, request, queryset):
+        '''measures the per-feature cost of the feature hooks'''
+        objects = list(queryset)
+        start = time.perf_counter()
+        count = sum(1 for f in model_admin.get_geojson_feature_iterator(request, objects))
+        elapsed = time.perf_counter() - start
+        self.out.write('%-12s %10s %-20s %10.3fs %12.2fus per feature' % (
+            self.model._meta.model_name, rows, name, elapsed, elapsed / max(count, 1) * 1e6,
+        ))
+        self.results.append({
+            'model': self.model._meta.model_name,
+            'rows': rows,
+            'name': name,
+            'seconds': elapsed,
+            'features': count,
+        })
+
+    def measure(self, rows, name, func):
+        '''measures the time, the result size, the peak memory and the number of queries of the `func` call'''
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = func()
+            size = result if isinstance(result, int) else len(result)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.out.write('%-12s %10s %-20s %10.3fs %12s bytes %12s peak %6s queries' % (
+            self.model._meta.model_name, rows, name, elapsed, size, peak, len(queries),
+        ))
+        self.results.append({
+            'model': self.model._meta.model_name,
+            'rows': rows,
+            'name': name,
+            'seconds': elapsed,
+            'size': size,
+            'peak': peak,
+            'queries': len(queries),
+        })
+        return result
@@ -55,6 +55,13 @@ class DeliveryJob(models.Model):
 
     pickup_point = models.PointField(geography=True, null=True, blank=True, verbose_name=_("Pickup Point"), help_text=_("Where to get cargo"))
     dropoff_point = models.PointField(geography=True, null=True, blank=True, verbose_name=_("Dropoff Point"), help_text=_("Where to delivery cargo"))
+    waypoint = models.ForeignKey(
+        Waypoint,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='delivery_jobs',
+        verbose_name=_('Waypoint'),
+    )
 
     def __str__(self):
         return self.name
@@ -84,7 +84,7 @@ TEMPLATES = [
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.contrib.gis.db.backends.postgis',
+        'ENGINE': os.environ.get('DATABASE_ENGINE', 'django.contrib.gis.db.backends.postgis'),
         'NAME': os.environ.get('DATABASE_NAME', 'test'),
         'USER': os.environ.get('DATABASE_USER', 'test'),
         'PASSWORD': os.environ.get('DATABASE_PASSWORD', 'test'),
@@ -92,6 +92,18 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'leaflet': {
+        'BACKEND': 'leaflet_admin_list.cache.BoundedLocMemCache',
+        'OPTIONS': {
+            'MAX_SIZE': 16 * 1024 * 1024,
+        },
+    },
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.10/topics/i18n/
 
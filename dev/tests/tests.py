@@ -1,11 +1,51 @@
+import io
 import json
+import os
 import re
+import tempfile
+import tracemalloc
+import unittest
+import warnings
+from unittest import mock
 
+from tests.admin import DeliveryJobAdmin
 from tests.models import Building, DeliveryJob, Waypoint
 
+import django
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.models import User
+from django.contrib.gis.db.models import PointField
 from django.contrib.gis.geos import GeometryCollection, Point
-from django.test import Client, TestCase
+from django.contrib.staticfiles import finders
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Prefetch
+from django.test import Client, RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from leaflet_admin_list import (
+    cache,
+    cluster,
+    compact,
+    context,
+    encoder,
+    polyline,
+    timing,
+    vendor,
+)
+from leaflet_admin_list.admin import LeafletAdminListMixin
+from leaflet_admin_list.filters import (
+    BoundingBoxFilter,
+    DistanceFilter,
+    PolygonFilter,
+)
+from leaflet_admin_list.paginator import EstimatedPaginator
+from leaflet_admin_list.queries import FeatureQueriesWarning
+from leaflet_admin_list.views import LeafletChangeList
 
 
 class ModuleTest(TestCase):
@@ -62,7 +102,7 @@ class ModuleTest(TestCase):
         c = Client()
         c.login(username='user', password='password')
         response = c.get('/admin/tests/waypoint/')
-        self.assertIn('js = {"type": "FeatureCollection", "features": [', response.content.decode('utf-8'))
+        self.assertIn('id="leaflet_admin_list_geojson">{"type": "FeatureCollection", "features": [', response.content.decode('utf-8'))
 
     def test_004_admin_page_bounding_box_filter_works(self):
         """Test whether the bounding box filter works"""
@@ -87,7 +127,7 @@ class ModuleTest(TestCase):
         }
         response = c.get('/admin/tests/waypoint/?bounding_box=%s,%s,%s,%s' % bb)
         content = response.content.decode('utf-8')
-        self.assertIn(json.dumps(js), content)
+        self.assertIn(encoder.script_escape(json.dumps(js)), content)
         self.assertRegex(content, r'<a href="[^>].*>Waypoint Test 4</a>')
         self.assertRegex(content, r'<p class="paginator">(.|\n)*1 Waypoint(.|\n)*</p>')
 
@@ -111,7 +151,7 @@ class ModuleTest(TestCase):
         c.login(username='user', password='password')
         response = c.get('/admin/tests/deliveryjob/')
         content = response.content.decode('utf-8')
-        match = re.search(r'({"type": "FeatureCollection", "features":[^;]*);', content)
+        match = re.search(r'<script type="application/json" id="leaflet_admin_list_geojson">(.*?)</script>', content)
         self.assertIsNotNone(match)
         js = json.loads(match.group(1))
         self.assertIn('features', js)
@@ -140,4 +180,754 @@ class ModuleTest(TestCase):
         c = Client()
         c.login(username='user', password='password')
         response = c.get('/admin/tests/building/')
-        self.assertIn('js = {"type": "FeatureCollection", "features": [', response.content.decode('utf-8'))
+        self.assertIn('id="leaflet_admin_list_geojson">{"type": "FeatureCollection", "features": [', response.content.decode('utf-8'))
+
+    def test_009_admin_page_feature_list_database_side(self):
+        """Test whether the feature collection built by the database is the same as built by python"""
+        c = Client()
+        c.login(username='user', password='password')
+        response = c.get('/admin/tests/deliveryjob/')
+        match = re.search(r'<script type="application/json" id="leaflet_admin_list_geojson">(.*?)</script>', response.content.decode('utf-8'))
+        expected = json.loads(match.group(1))
+        with mock.patch.object(admin.site._registry[DeliveryJob], 'geojson_database_side', True):
+            response = c.get('/admin/tests/deliveryjob/')
+        match = re.search(r'<script type="application/json" id="leaflet_admin_list_geojson">(.*?)</script>', response.content.decode('utf-8'))
+        self.assertIsNotNone(match)
+        self.assertEqual(json.loads(match.group(1)), expected)
+
+    def test_010_admin_geojson_view(self):
+        """Test whether the feature collection view follows the changelist filters and supports conditional requests"""
+        c = Client()
+        c.login(username='user', password='password')
+        wp = self.waypoints[3]
+        b = wp.waypoint.coords
+        bb = (b[0] - 0.0001, b[1] - 0.0001, b[0] + 0.0001, b[1] + 0.0001)
+        response = c.get('/admin/tests/waypoint/geojson/?bounding_box=%s,%s,%s,%s' % bb)
+        self.assertEqual(response.status_code, 200)
+        js = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([f['properties']['pk'] for f in js['features']], [wp.pk])
+
+        response = c.get('/admin/tests/waypoint/geojson/')
+        self.assertEqual(len(json.loads(response.content.decode('utf-8'))['features']), len(self.waypoints))
+        response = c.get('/admin/tests/waypoint/geojson/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        with mock.patch.object(admin.site._registry[Waypoint], 'geojson_async', True):
+            response = c.get('/admin/tests/waypoint/')
+        content = response.content.decode('utf-8')
+        self.assertNotIn('id="leaflet_admin_list_geojson"', content)
+        self.assertIn('"geojson_url": "/admin/tests/waypoint/geojson/?', content)
+
+    def test_011_admin_geojson_view_viewport(self):
+        """Test whether the feature collection view returns features inside the map view regardless of paging"""
+        c = Client()
+        c.login(username='user', password='password')
+        wp = self.waypoints[3]
+        b = wp.waypoint.coords
+        bb = (b[0] - 0.0001, b[1] - 0.0001, b[0] + 0.0001, b[1] + 0.0001)
+        with CaptureQueriesContext(connection) as queries:
+            response = c.get('/admin/tests/waypoint/geojson/?map_bbox=%s,%s,%s,%s&map_zoom=15' % bb)
+        js = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([f['properties']['pk'] for f in js['features']], [wp.pk])
+        self.assertFalse(js['truncated'])
+        # the changelist of the map view is neither paginated nor counted
+        self.assertFalse([q for q in queries.captured_queries if 'COUNT(' in q['sql'].upper()])
+
+        model_admin = admin.site._registry[Waypoint]
+        with mock.patch.object(model_admin, 'geojson_viewport_limit', 2), mock.patch.object(model_admin, 'list_per_page', 1):
+            response = c.get('/admin/tests/waypoint/geojson/?map_bbox=-180,-90,180,90&map_zoom=1')
+        js = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(len(js['features']), 2)
+        self.assertTrue(js['truncated'])
+
+        response = c.get('/admin/tests/waypoint/geojson/?map_bbox=wrong')
+        self.assertEqual(response.status_code, 400)
+
+    def test_012_admin_tile_view(self):
+        """Test whether the vector tile view returns tiles for the changelist query"""
+        c = Client()
+        c.login(username='user', password='password')
+        with CaptureQueriesContext(connection) as queries:
+            response = c.get('/admin/tests/deliveryjob/tiles/0/0/0.mvt?kind=wood')
+        self.assertEqual(response.status_code, 200)
+        # the changelist of the tile is neither paginated nor counted
+        self.assertFalse([q for q in queries.captured_queries if 'COUNT(' in q['sql'].upper()])
+        self.assertEqual(response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        self.assertIn(b'pickup_point', response.content)
+        self.assertIn(b'dropoff_point', response.content)
+
+        response = c.get('/admin/tests/deliveryjob/tiles/0/0/0.mvt?kind=oil')
+        self.assertEqual(response.content, b'')
+
+        response = c.get('/admin/tests/deliveryjob/tiles/1/2/0.mvt')
+        self.assertEqual(response.status_code, 400)
+
+    def test_013_admin_tile_python_encoder(self):
+        """Test whether the python vector tile encoder produces the layer and the map uses tiles"""
+        model_admin = admin.site._registry[Building]
+        queryset = Building.objects.all()
+        content = model_admin.get_tile_layer_python(None, 'geometry', queryset, 0, 0, 0)
+        self.assertTrue(model_admin.get_tile_layer_postgis(None, 'geometry', queryset, 0, 0, 0))
+        self.assertIn(b'geometry', content)
+        self.assertIn(str(self.buildings[0].pk).encode('utf-8'), content)
+
+        with mock.patch.object(model_admin, 'geojson_tiles', True):
+            c = Client()
+            c.login(username='user', password='password')
+            response = c.get('/admin/tests/building/')
+        content = response.content.decode('utf-8')
+        self.assertIn('<script src="https://unpkg.com/leaflet.vectorgrid@', content)
+        self.assertIn('"geojson_tiles_url": "/admin/tests/building/tiles/{z}/{x}/{y}.mvt?', content)
+
+    def test_014_admin_geojson_view_clusters(self):
+        """Test whether the feature collection view returns clusters when the map view contains too many objects"""
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[DeliveryJob]
+        with mock.patch.object(model_admin, 'geojson_cluster', True), mock.patch.object(model_admin, 'geojson_viewport_limit', 2):
+            response = c.get('/admin/tests/deliveryjob/geojson/?map_bbox=-180,-90,180,90&map_zoom=1')
+            js = json.loads(response.content.decode('utf-8'))
+            self.assertTrue(js['clustered'])
+            self.assertTrue(all(f['properties']['cluster'] for f in js['features']))
+            self.assertEqual(sum(f['properties']['count'] for f in js['features'] if f['properties']['field'] == 'pickup_point'), 9)
+            self.assertEqual(sum(f['properties']['count'] for f in js['features'] if f['properties']['field'] == 'dropoff_point'), 9)
+
+            clusters = model_admin.get_geojson_clusters(None, 'pickup_point', DeliveryJob.objects.all(), cluster.grid_size(60, 1))
+            self.assertEqual(len(clusters), 1)
+            self.assertEqual(clusters[0][0], 9)
+
+        with mock.patch.object(cluster, 'numpy', None):
+            points = [(p.pickup_point.x, p.pickup_point.y) + p.pickup_point.extent for p in self.delivery_jobs]
+            self.assertEqual(cluster.grid_clusters(points, 100)[0][0], 9)
+            self.assertEqual(len(cluster.grid_clusters(points, 0.001)), 9)
+
+    def test_015_admin_page_single_changelist_query(self):
+        """Test whether the map and the list share the same changelist queries"""
+        c = Client()
+        c.login(username='user', password='password')
+        for database_side in (False, True):
+            with mock.patch.object(admin.site._registry[DeliveryJob], 'geojson_database_side', database_side):
+                with CaptureQueriesContext(connection) as queries:
+                    response = c.get('/admin/tests/deliveryjob/?kind=wood')
+            self.assertIn('id="leaflet_admin_list_geojson">{"type": "FeatureCollection", "features": [', response.content.decode('utf-8'))
+            sql = [q['sql'] for q in queries.captured_queries if '"tests_deliveryjob"' in q['sql']]
+            self.assertEqual(len(sql), len(set(sql)))
+            self.assertEqual(len([q for q in sql if 'LIMIT' in q.upper()]), 1)
+
+    def test_016_admin_feature_list_chunks(self):
+        """Test whether the streamed feature list is the same as the feature list"""
+        model_admin = admin.site._registry[DeliveryJob]
+        queryset = DeliveryJob.objects.order_by('pk')
+        chunks = list(model_admin.get_geojson_feature_list_chunks(None, queryset, truncated=False))
+        expected = model_admin.get_geojson_feature_list(None, queryset)
+        expected['truncated'] = False
+        self.assertEqual(''.join(chunks), json.dumps(expected))
+        self.assertEqual(len(expected['features']), len(self.delivery_jobs) * 2)
+        raw = encoder.RawJSON('{"type": "Point", "coordinates": [50.0, 50.0]}')
+        self.assertEqual(encoder.dumps([{'geometry': raw}, {'geometry': raw}]), json.dumps([{'geometry': json.loads(raw.text)}] * 2))
+        self.assertIs(encoder.dumps(raw), raw.text)
+
+    def test_017_admin_feature_context(self):
+        """Test whether the per-request data is resolved once per request"""
+        c = Client()
+        c.login(username='user', password='password')
+        with mock.patch.object(context, 'reverse', wraps=context.reverse) as reverse_mock:
+            response = c.get('/admin/tests/building/')
+        self.assertEqual(reverse_mock.call_count, 1)
+        for b in self.buildings:
+            self.assertIn(reverse('admin:tests_building_change', args=[b.pk]), response.content.decode('utf-8'))
+
+        model_admin = admin.site._registry[Waypoint]
+        feature_context = model_admin.create_geojson_context(None, Waypoint.objects.all())
+        for pk in (1, 'a b/c?d', 'ünicode'):
+            self.assertEqual(feature_context.get_change_url(pk), reverse('admin:tests_waypoint_change', args=[pk]))
+        self.assertEqual(feature_context.geometry_fields, ['waypoint'])
+        self.assertEqual(feature_context.get_verbose_name('waypoint'), 'Waypoint')
+
+    def test_018_admin_geojson_view_only_fields(self):
+        """Test whether the feature collection view loads only necessary columns"""
+        c = Client()
+        c.login(username='user', password='password')
+        response = c.get('/admin/tests/deliveryjob/geojson/')
+        expected = json.loads(response.content.decode('utf-8'))
+        for database_side in (False, True):
+            model_admin = admin.site._registry[DeliveryJob]
+            with mock.patch.object(model_admin, 'geojson_only_fields', ['name']), mock.patch.object(model_admin, 'geojson_database_side', database_side):
+                with CaptureQueriesContext(connection) as queries:
+                    response = c.get('/admin/tests/deliveryjob/geojson/')
+            self.assertEqual(json.loads(response.content.decode('utf-8')), expected)
+            sql = [q['sql'] for q in queries.captured_queries if 'LIMIT' in q['sql'] and '"tests_deliveryjob"' in q['sql']]
+            self.assertEqual(len(sql), 1)
+            self.assertIn('"tests_deliveryjob"."name"', sql[0])
+            self.assertNotIn('"tests_deliveryjob"."price"', sql[0])
+            self.assertEqual('ST_ASGEOJSON' in sql[0].upper(), database_side)
+
+    def test_019_admin_geojson_view_simplify(self):
+        """Test whether the feature collection view simplifies geometries and rounds coordinates for the map zoom level"""
+        building = Building.objects.create(name='Building Round', geometry=GeometryCollection([Point([40, 40]).buffer(0.1, quadsegs=64)]))
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[Building]
+        url = '/admin/tests/building/geojson/?map_bbox=39,39,41,41&map_zoom=%s'
+        for database_side in (False, True):
+            with mock.patch.object(model_admin, 'geojson_database_side', database_side):
+                js = json.loads(c.get(url % 5).content.decode('utf-8'))
+                self.assertEqual(len(js['features'][0]['geometry']['geometries'][0]['coordinates'][0]), 257)
+                with mock.patch.object(model_admin, 'geojson_simplify', 1), mock.patch.object(model_admin, 'geojson_precision', 3):
+                    js = json.loads(c.get(url % 5).content.decode('utf-8'))
+                    self.assertEqual(js['features'][0]['properties']['pk'], str(building.pk))
+                    ring = js['features'][0]['geometry']['geometries'][0]['coordinates'][0]
+                    self.assertLess(len(ring), 20)
+                    self.assertTrue(all(round(v, 3) == v for p in ring for v in p))
+                    js = json.loads(c.get(url % 15).content.decode('utf-8'))
+                    self.assertEqual(len(js['features'][0]['geometry']['geometries'][0]['coordinates'][0]), 257)
+                with mock.patch.object(model_admin, 'geojson_precision', 0):
+                    js = json.loads(c.get(url % 15).content.decode('utf-8'))
+                    ring = js['features'][0]['geometry']['geometries'][0]['coordinates'][0]
+                    self.assertTrue(all(round(v) == v for p in ring for v in p))
+
+        # the tolerance in degrees is converted to units of projected coordinate systems
+        self.assertEqual(cluster.field_size(0.1, PointField(srid=4326), connection), 0.1)
+        self.assertEqual(cluster.field_size(0.1, PointField(geography=True), connection), 0.1)
+        self.assertAlmostEqual(cluster.field_size(0.1, PointField(srid=3857), connection), 11131.95, places=2)
+
+    def test_020_bbox_filter_fast(self):
+        """Test whether the fast bounding box filter selects the same objects using the spatial index"""
+        spec = BoundingBoxFilter(None, {}, DeliveryJob, admin.site._registry[DeliveryJob])
+        polygon = spec.get_bbox('50.015,50.015,50.055,50.055')
+        queryset = DeliveryJob.objects.all()
+        expected = set(spec.filter_bbox(None, queryset, polygon).values_list('pk', flat=True))
+        self.assertTrue(expected)
+        with connection.cursor() as cursor:
+            indexes = {
+                c['columns'][0]: name
+                for name, c in connection.introspection.get_constraints(cursor, DeliveryJob._meta.db_table).items()
+                if c['index'] and c['type'] == 'gist'
+            }
+            # the table is too small for the planner to prefer the index by itself
+            cursor.execute('SET enable_seqscan = off')
+        for union in (False, True):
+            with mock.patch.object(BoundingBoxFilter, 'fast', True), mock.patch.object(BoundingBoxFilter, 'union', union):
+                filtered = spec.filter_bbox(None, queryset, polygon)
+                self.assertEqual(set(filtered.values_list('pk', flat=True)), expected)
+                self.assertIn('&&', str(filtered.query))
+                plan = filtered.explain()
+                self.assertIn(indexes['pickup_point'], plan)
+                self.assertIn(indexes['dropoff_point'], plan)
+                self.assertNotIn('Seq Scan', plan)
+                self.assertEqual('UNION' in str(filtered.query).upper(), union)
+
+    def test_021_admin_geojson_cache(self):
+        """Test whether the feature collection is cached until the model data is changed"""
+        c = Client()
+        c.login(username='user', password='password')
+        url = '/admin/tests/deliveryjob/geojson/?kind=wood'
+        expected = c.get(url).content
+        model_admin = admin.site._registry[DeliveryJob]
+        caches['leaflet'].clear()
+        cache.stats.clear()
+        with mock.patch.object(model_admin, 'geojson_cache', 'leaflet'):
+            response = c.get(url)
+            self.assertEqual(b''.join(response.streaming_content), expected)
+            self.assertEqual(cache.stats['list_misses'], 1)
+            self.assertEqual(cache.stats['feature_misses'], len(self.delivery_jobs))
+            response = c.get(url)
+            self.assertEqual(b''.join(response.streaming_content), expected)
+            self.assertEqual(cache.stats['list_hits'], 1)
+            self.assertEqual(c.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+            # cached features are spliced into the feature list as they are
+            with mock.patch.object(encoder, 'dumps', wraps=encoder.dumps) as encoded:
+                b''.join(c.get('/admin/tests/deliveryjob/geojson/').streaming_content)
+            self.assertEqual(cache.stats['feature_hits'], len(self.delivery_jobs))
+            self.assertFalse([call for call in encoded.call_args_list if isinstance(call.args[0], (dict, encoder.RawJSON))])
+
+            job = self.delivery_jobs[0]
+            job.name = 'Delivery Changed'
+            job.save()
+            self.assertEqual(c.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+            self.assertIn(b'Delivery Changed', b''.join(c.get(url).streaming_content))
+
+            # features are cached separately for every language and key part
+            etag = c.get(url)['ETag']
+            with translation.override('de'):
+                self.assertNotEqual(c.get(url)['ETag'], etag)
+            with mock.patch.object(DeliveryJobAdmin, 'get_geojson_cache_key_parts', lambda self, request: (request.user.pk,)):
+                self.assertNotEqual(c.get(url)['ETag'], etag)
+            self.assertEqual(c.get(url)['ETag'], etag)
+
+            etag = c.get(url)['ETag']
+            DeliveryJob.objects.update(name='Delivery Updated')
+            cache.invalidate(DeliveryJob)
+            self.assertNotEqual(c.get(url)['ETag'], etag)
+
+        # the version is changed by saving objects even if the map has never been served by the process
+        cache._registry.pop(Waypoint._meta.label_lower, None)
+        type('WaypointCacheAdmin', (type(admin.site._registry[Waypoint]),), {'geojson_cache': 'leaflet'})(Waypoint, admin.site)
+        version = cache.get_version(Waypoint, 'leaflet')
+        self.waypoints[0].save()
+        self.assertNotEqual(cache.get_version(Waypoint, 'leaflet'), version)
+
+        bounded = cache.BoundedLocMemCache('test-bounded', {'OPTIONS': {'MAX_SIZE': 1000}})
+        for i in range(10):
+            bounded.set('key%s' % i, 'x' * 300)
+        self.assertLessEqual(bounded._usage.total, 1000)
+        self.assertEqual(bounded.get('key9'), 'x' * 300)
+        self.assertIsNone(bounded.get('key0'))
+
+    def test_022_admin_geojson_delta(self):
+        """Test whether the feature collection view returns only features changed since the version known by the client"""
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[DeliveryJob]
+        url = '/admin/tests/deliveryjob/geojson/?map_bbox=%s&map_zoom=10'
+        with mock.patch.object(model_admin, 'geojson_delta', True):
+            js = json.loads(c.get(url % '-180,-90,180,90').content.decode('utf-8'))
+            self.assertFalse(js['delta'])
+            self.assertEqual(len(js['features']), len(self.delivery_jobs) * 2)
+
+            js = json.loads(c.get(url % '-180,-90,180,90', {'map_version': js['version']}).content.decode('utf-8'))
+            self.assertTrue(js['delta'])
+            self.assertEqual(js['features'], [])
+            self.assertEqual(js['removed'], [])
+
+            # the pickup and dropoff points of the job in the middle are the same
+            job = self.delivery_jobs[4]
+            job.name = 'Delivery Changed'
+            job.save()
+            js = json.loads(c.get(url % '-180,-90,180,90', {'map_version': js['version']}).content.decode('utf-8'))
+            self.assertEqual({f['properties']['pk'] for f in js['features']}, {job.pk})
+            self.assertEqual(len(js['features']), 2)
+
+            p = job.pickup_point.coords
+            js = json.loads(c.get(url % '%s,%s,%s,%s' % (p[0] - 0.001, p[1] - 0.001, p[0] + 0.001, p[1] + 0.001), {
+                'map_version': js['version'],
+            }).content.decode('utf-8'))
+            self.assertEqual(js['features'], [])
+            self.assertEqual(sorted(js['removed']), sorted(j.pk for j in self.delivery_jobs if j.pk != job.pk))
+
+            js = json.loads(c.get(url % '-180,-90,180,90', {'map_version': 'unknown'}).content.decode('utf-8'))
+            self.assertFalse(js['delta'])
+            self.assertEqual(len(js['features']), len(self.delivery_jobs) * 2)
+
+    def test_023_admin_geojson_compact(self):
+        """Test whether the compact feature list represents the same features as the GeoJSON one"""
+        c = Client()
+        c.login(username='user', password='password')
+        expected = json.loads(c.get('/admin/tests/deliveryjob/geojson/').content.decode('utf-8'))
+        model_admin = admin.site._registry[DeliveryJob]
+        with mock.patch.object(model_admin, 'geojson_format', 'compact'):
+            response = c.get('/admin/tests/deliveryjob/geojson/')
+            js = json.loads(response.content.decode('utf-8'))
+            self.assertEqual(js['type'], 'CompactFeatureCollection')
+            self.assertLess(len(response.content), len(json.dumps(expected)))
+            decoded = compact.decode_feature_list(js)
+            self.assertEqual(len(decoded['features']), len(expected['features']))
+            for feature, expected_feature in zip(decoded['features'], expected['features']):
+                self.assertEqual(feature['properties'], expected_feature['properties'])
+                self.assertEqual(feature['geometry']['type'], expected_feature['geometry']['type'])
+                for a, b in zip(feature['geometry']['coordinates'], expected_feature['geometry']['coordinates']):
+                    self.assertAlmostEqual(a, b, places=6)
+
+            response = c.get('/admin/tests/deliveryjob/')
+            self.assertIn('id="leaflet_admin_list_geojson">{"type": "CompactFeatureCollection"', response.content.decode('utf-8'))
+
+    def test_024_benchmark_command(self):
+        """Test whether the benchmark command reports results as JSON"""
+        stdout = io.StringIO()
+        call_command('leaflet_benchmark', rows=[10], models=['deliveryjob', 'building'], json='-', stdout=stdout, stderr=io.StringIO())
+        report = json.loads(stdout.getvalue())
+        names = {(r['model'], r['name']) for r in report['results']}
+        for name in ('changelist', 'geojson viewport', 'bbox filter', 'feature list'):
+            self.assertIn(('deliveryjob', name), names)
+            self.assertIn(('building', name), names)
+        self.assertIn(('building', 'simplified z8'), names)
+        self.assertTrue(all(r['queries'] >= 1 for r in report['results'] if r['name'] == 'changelist'))
+        self.assertEqual(DeliveryJob.objects.count(), len(self.delivery_jobs))
+
+    def test_025_admin_timing(self):
+        """Test whether times of stages are exposed by the Server-Timing header and the signal"""
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[DeliveryJob]
+        received = []
+
+        def receiver(sender, model_admin, request, timings, **kwargs):
+            received.append(timings.as_dict())
+
+        timing.timings_recorded.connect(receiver, sender=DeliveryJobAdmin)
+        try:
+            with mock.patch.object(model_admin, 'geojson_timing', True), mock.patch.object(model_admin, 'geojson_timing_overlay', True):
+                response = c.get('/admin/tests/deliveryjob/geojson/?map_bbox=-180,-90,180,90&map_zoom=10')
+                self.assertEqual(len(received), 1)
+                self.assertEqual(received[0]['query']['count'], len(self.delivery_jobs))
+                self.assertEqual(received[0]['features']['count'], len(self.delivery_jobs) * 2)
+                self.assertEqual(received[0]['encode']['count'], len(response.content))
+                # the area filter is measured by the query applying it, not by a separate one
+                self.assertNotIn('bbox', received[0])
+                for name in ('changelist', 'query', 'features', 'encode'):
+                    self.assertIn(name + ';dur=', response['Server-Timing'])
+
+                response = c.get('/admin/tests/deliveryjob/')
+                self.assertEqual(len(received), 2)
+                self.assertIn('render;dur=', response['Server-Timing'])
+                self.assertIn('"geojson_timing": "changelist;dur=', response.content.decode('utf-8'))
+            response = c.get('/admin/tests/deliveryjob/')
+            self.assertEqual(len(received), 2)
+            self.assertNotIn('Server-Timing', response)
+        finally:
+            timing.timings_recorded.disconnect(receiver, sender=DeliveryJobAdmin)
+
+    def test_026_admin_render_mode(self):
+        """Test whether the map is drawn on the canvas and parsed in the Web Worker if requested"""
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[DeliveryJob]
+        response = c.get('/admin/tests/deliveryjob/')
+        config = json.loads(re.search(r'id="leaflet_admin_list_config">(.*?)</script>', response.content.decode('utf-8')).group(1))
+        self.assertEqual(config['geojson_render'], 'dom')
+        self.assertFalse(config['geojson_worker'])
+
+        with mock.patch.object(model_admin, 'geojson_render', 'canvas'), mock.patch.object(model_admin, 'geojson_worker', True):
+            response = c.get('/admin/tests/deliveryjob/')
+            content = response.content.decode('utf-8')
+            config = json.loads(re.search(r'id="leaflet_admin_list_config">(.*?)</script>', content).group(1))
+            self.assertEqual(config['geojson_render'], 'canvas')
+            self.assertTrue(config['geojson_worker'])
+            self.assertEqual(config['geojson_worker_chunk_size'], 1000)
+            geojson = re.search(r'<script type="application/json" id="leaflet_admin_list_geojson">(.*?)</script>', content)
+            self.assertEqual(len(json.loads(geojson.group(1))['features']), len(self.delivery_jobs) * 2)
+
+        with mock.patch.object(model_admin, 'geojson_render', 'webgl'), mock.patch.object(model_admin, 'geojson_viewport', True):
+            response = c.get('/admin/tests/deliveryjob/')
+            content = response.content.decode('utf-8')
+            self.assertIn('<script src="https://unpkg.com/leaflet.glify@', content)
+            self.assertNotIn('leaflet_admin_list_geojson', content)
+
+        script = open(finders.find('leaflet_admin_list/leaflet_admin_list.js')).read()
+        self.assertIn('preferCanvas: config.geojson_render != \'dom\'', script)
+        self.assertIn('L.circleMarker', script)
+        self.assertIn('new Worker', script)
+
+    def test_027_admin_page_links_delegated(self):
+        """Test whether links of filters and pages are rewritten by the single delegated handler when pressed"""
+        script = open(finders.find('leaflet_admin_list/leaflet_admin_list.js')).read()
+        self.assertEqual(script.count("on('mousedown click', '#changelist-filter a, .paginator a'"), 1)
+        # links are resolved by the script using attributes of the rendered filter
+        c = Client()
+        c.login(username='user', password='password')
+        bbox = '50.015,50.015,50.055,50.055'
+        content = c.get('/admin/tests/deliveryjob/', {'bounding_box': bbox}).content.decode('utf-8')
+        self.assertIn('<ul class="bounding_box_filter" parameter_name="bounding_box" bbox_selected="%s"' % bbox, content)
+        self.assertIn('href="?bounding_box=%s"' % bbox.replace(',', '%2C'), content)
+        content = c.get('/admin/tests/deliveryjob/').content.decode('utf-8')
+        self.assertIn('<ul class="bounding_box_filter" parameter_name="bounding_box" bbox_selected=""', content)
+
+    def test_028_admin_static_script(self):
+        """Test whether the map script is the static file configured by the page and plugins may be vendored"""
+        c = Client()
+        c.login(username='user', password='password')
+        with mock.patch.object(DeliveryJob._meta, 'verbose_name', '</script><b>job'):
+            response = c.get('/admin/tests/deliveryjob/')
+        content = response.content.decode('utf-8')
+        self.assertIn('<script src="/static/leaflet_admin_list/leaflet_admin_list.js"></script>', content)
+        self.assertIn(vendor.JS[0], content)
+        self.assertNotIn('</script><b>job', content.split('id="leaflet_admin_list_config">')[1].split('</script>')[0])
+        config = json.loads(re.search(r'id="leaflet_admin_list_config">(.*?)</script>', content).group(1))
+        self.assertEqual(config['messages']['verbose_name'], '</script><b>job')
+        # the inline feature list is escaped the same way
+        job = self.delivery_jobs[0]
+        job.name = '</script><b>job'
+        job.save()
+        content = c.get('/admin/tests/deliveryjob/').content.decode('utf-8')
+        geojson = content.split('id="leaflet_admin_list_geojson">')[1].split('</script>')[0]
+        self.assertNotIn('<b>job', geojson)
+        tooltips = {f['properties']['tooltip'] for f in json.loads(geojson)['features']}
+        self.assertIn('</script><b>job: Pickup Point', tooltips)
+
+        with tempfile.TemporaryDirectory() as output:
+            with mock.patch('leaflet_admin_list.management.commands.leaflet_admin_list_vendor.urlopen') as urlopen:
+                urlopen.side_effect = lambda url: io.BytesIO(('/* content of %s */' % url).encode('utf-8'))
+                call_command('leaflet_admin_list_vendor', '--output', output, stdout=io.StringIO())
+            with open(os.path.join(output, 'leaflet_admin_list', 'vendor', 'plugins.js')) as f:
+                bundle = f.read()
+            for url in vendor.JS:
+                self.assertIn('content of %s' % url, bundle)
+            self.assertTrue(os.path.exists(os.path.join(output, 'leaflet_admin_list', 'vendor', 'glify-browser.js')))
+
+        with override_settings(LEAFLET_ADMIN_LIST_VENDOR=True), mock.patch.object(admin.site._registry[Building], 'geojson_tiles', True):
+            response = c.get('/admin/tests/building/')
+        content = response.content.decode('utf-8')
+        self.assertIn('/static/leaflet_admin_list/vendor/plugins.js', content)
+        self.assertIn('/static/leaflet_admin_list/vendor/Leaflet.VectorGrid.bundled.js', content)
+        self.assertNotIn(vendor.JS[0], content)
+
+    def test_029_polygon_and_distance_filters(self):
+        """Test whether the drawn polygon and the distance filters select objects exactly using the spatial index"""
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[DeliveryJob]
+        queryset = DeliveryJob.objects.all()
+        # the bounding box of the triangle contains all objects, the triangle itself doesn't contain the 5th one
+        triangle = polyline.encode([[49.98, 50.12], [50.12, 50.12], [49.98, 49.995]])
+        expected = {self.delivery_jobs[i].pk for i in (0, 1, 2, 3, 5, 6, 7, 8)}
+        # objects within 2 km of the first pickup point
+        distance = '50.01,50.09,2000'
+        expected_distance = {self.delivery_jobs[i].pk for i in (0, 1, 7, 8)}
+        for spec, value, expected_pks in (
+            (PolygonFilter(None, {}, DeliveryJob, model_admin), triangle, expected),
+            (DistanceFilter(None, {}, DeliveryJob, model_admin), distance, expected_distance),
+        ):
+            area = spec.get_bbox(value)
+            for fast in (False, True):
+                with mock.patch.object(type(spec), 'fast', fast):
+                    filtered = spec.filter_bbox(None, queryset, area)
+                    self.assertEqual(set(filtered.values_list('pk', flat=True)), expected_pks)
+                    self.assertEqual('&&' in str(filtered.query) or 'DWithin' in str(filtered.query), fast)
+
+            with mock.patch.object(model_admin, 'list_filter', ['kind', PolygonFilter, DistanceFilter]):
+                response = c.get('/admin/tests/deliveryjob/', {spec.parameter_name: value})
+                content = response.content.decode('utf-8')
+                self.assertIn('<ul class="%s"' % spec.html_class, content)
+                geojson = re.search(r'id="leaflet_admin_list_geojson">(.*?)</script>', content)
+                self.assertEqual({f['properties']['pk'] for f in json.loads(geojson.group(1))['features']}, expected_pks)
+
+        self.assertIsNone(PolygonFilter(None, {}, DeliveryJob, model_admin).get_bbox('not a polyline'))
+        self.assertIsNone(DistanceFilter(None, {}, DeliveryJob, model_admin).get_bbox('50,50,-1'))
+
+    def test_030_admin_count_estimate(self):
+        """Test whether the number of objects filtered by the area is counted exactly only under the threshold"""
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[DeliveryJob]
+        bbox = {'bounding_box': '49.9,49.9,50.2,50.2'}
+        with mock.patch.object(model_admin, 'geojson_count_estimate', True), mock.patch.object(model_admin, 'geojson_count_threshold', 2):
+            response = c.get('/admin/tests/deliveryjob/', bbox)
+            cl = response.context['cl']
+            self.assertIsInstance(cl.paginator, EstimatedPaginator)
+            self.assertTrue(cl.paginator.estimated or cl.paginator.capped)
+            self.assertGreater(cl.result_count, 2)
+            self.assertContains(response, 'class="help leaflet_admin_list_count"')
+            # the full list is not filtered by the area
+            response = c.get('/admin/tests/deliveryjob/')
+            self.assertNotIsInstance(response.context['cl'].paginator, EstimatedPaginator)
+            self.assertEqual(response.context['cl'].result_count, len(self.delivery_jobs))
+            self.assertNotContains(response, 'leaflet_admin_list_count')
+        with mock.patch.object(model_admin, 'geojson_count_estimate', True), mock.patch.object(model_admin, 'geojson_count_threshold', 100):
+            response = c.get('/admin/tests/deliveryjob/', bbox)
+            cl = response.context['cl']
+            self.assertFalse(cl.paginator.estimated or cl.paginator.capped)
+            self.assertEqual(cl.result_count, len(self.delivery_jobs))
+            self.assertIsNone(cl.result_count_note)
+
+    def test_031_admin_export(self):
+        """Test whether all filtered objects are exported by the streaming response using the constant memory"""
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[DeliveryJob]
+        bbox = '50.015,50.015,50.055,50.055'
+        spec = BoundingBoxFilter(None, {}, DeliveryJob, model_admin)
+        expected = set(spec.filter_bbox(None, DeliveryJob.objects.all(), spec.get_bbox(bbox)).values_list('pk', flat=True))
+        with mock.patch.object(model_admin, 'geojson_export', True):
+            response = c.get('/admin/tests/deliveryjob/')
+            self.assertContains(response, '/admin/tests/deliveryjob/export/?_export=ndjson')
+            with CaptureQueriesContext(connection) as queries:
+                response = c.get('/admin/tests/deliveryjob/export/', {'bounding_box': bbox})
+                self.assertTrue(response.streaming)
+                self.assertEqual(response['Content-Type'], 'application/geo+json')
+                feature_list = json.loads(b''.join(response.streaming_content))
+            self.assertFalse([q for q in queries.captured_queries if 'COUNT(' in q['sql'].upper()])
+            self.assertEqual({f['properties']['pk'] for f in feature_list['features']}, expected)
+            response = c.get('/admin/tests/deliveryjob/export/', {'bounding_box': bbox, '_export': 'ndjson'})
+            lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+            self.assertEqual(lines, [json.dumps(f) for f in feature_list['features']])
+            self.assertEqual(c.get('/admin/tests/deliveryjob/export/', {'_export': 'csv'}).status_code, 400)
+
+            selected = [o.pk for o in self.delivery_jobs[:2]]
+            response = c.post('/admin/tests/deliveryjob/', {'action': 'export_ndjson', '_selected_action': selected, 'index': 0})
+            features = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+            self.assertEqual(sorted(f['properties']['pk'] for f in features), sorted(selected * 2))
+
+            # the memory used to export ten times more objects stays the same
+            for kind, count in (('steel', 200), ('oil', 2000)):
+                DeliveryJob.objects.bulk_create([
+                    DeliveryJob(name='Export %s' % i, kind=kind, pickup_point=Point([10 + i / 10000, 10]), dropoff_point=Point([10, 10 + i / 10000]))
+                    for i in range(count)
+                ])
+            peaks = {}
+            with mock.patch.object(model_admin, 'geojson_export_chunk_size', 100):
+                for kind, count in (('steel', 200), ('oil', 2000)):
+                    tracemalloc.start()
+                    response = c.get('/admin/tests/deliveryjob/export/', {'kind': kind, '_export': 'ndjson'})
+                    self.assertEqual(sum(chunk.count(b'\n') for chunk in response.streaming_content), count * 2)
+                    peaks[kind] = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+            self.assertLess(peaks['oil'], peaks['steel'] * 2)
+        self.assertEqual(c.get('/admin/tests/deliveryjob/export/').status_code, 404)
+
+    @unittest.skipIf(django.VERSION < (4, 2), 'The async ORM and streaming are not supported')
+    async def test_032_admin_geojson_asgi_view(self):
+        """Test whether the asynchronous view produces the same features as the synchronous one"""
+        from asgiref.sync import sync_to_async
+        from django.test import AsyncClient
+
+        c = AsyncClient()
+        response = await c.get('/admin/tests/deliveryjob/geojson/asgi/')
+        self.assertEqual(response.status_code, 302)
+        await sync_to_async(c.force_login)(self.user)
+        model_admin = admin.site._registry[DeliveryJob]
+        for query in ('', '?map_bbox=50.015,50.015,50.055,50.055&map_zoom=10'):
+            expected = json.loads((await c.get('/admin/tests/deliveryjob/geojson/' + query)).content)
+            response = await c.get('/admin/tests/deliveryjob/geojson/asgi/' + query)
+            self.assertTrue(response.streaming)
+            feature_list = json.loads(b''.join([chunk async for chunk in response.streaming_content]))
+            self.assertEqual(feature_list.get('truncated'), expected.get('truncated'))
+            self.assertEqual(
+                sorted(json.dumps(f, sort_keys=True) for f in feature_list['features']),
+                sorted(json.dumps(f, sort_keys=True) for f in expected['features']),
+            )
+        with mock.patch.object(model_admin, 'geojson_viewport_limit', 2):
+            response = await c.get('/admin/tests/deliveryjob/geojson/asgi/?map_bbox=-180,-90,180,90')
+            feature_list = json.loads(b''.join([chunk async for chunk in response.streaming_content]))
+            self.assertTrue(feature_list['truncated'])
+            self.assertEqual(len(feature_list['features']), 4)
+        response = await c.get('/admin/tests/deliveryjob/geojson/asgi/?map_bbox=wrong')
+        self.assertEqual(response.status_code, 400)
+
+        def changelist_queries():
+            request = RequestFactory().get('/admin/tests/deliveryjob/geojson/asgi/', {'map_bbox': '-180,-90,180,90'})
+            request.user = self.user
+            with CaptureQueriesContext(connection) as queries:
+                model_admin.get_geojson_asgi_queryset(request)
+            return queries.captured_queries
+
+        # the changelist of the map view is neither paginated nor counted
+        self.assertFalse([q for q in await sync_to_async(changelist_queries)() if 'COUNT(' in q['sql'].upper()])
+
+        def tooltip(self, request, name, o, queryset):
+            return '%s: %s' % (o, o.waypoint)
+
+        job = self.delivery_jobs[0]
+        job.waypoint = self.waypoints[0]
+        await sync_to_async(job.save)()
+
+        # hooks querying the database are called synchronously for every batch of fetched objects
+        with mock.patch.object(DeliveryJobAdmin, 'get_geojson_feature_tooltip', tooltip), mock.patch.object(model_admin, 'geojson_asgi_chunk_size', 2):
+            response = await c.get('/admin/tests/deliveryjob/geojson/asgi/')
+            feature_list = json.loads(b''.join([chunk async for chunk in response.streaming_content]))
+            self.assertEqual(len(feature_list['features']), len(self.delivery_jobs) * 2)
+            self.assertIn('%s: %s' % (job, self.waypoints[0]), {f['properties']['tooltip'] for f in feature_list['features']})
+        with mock.patch.object(model_admin, 'geojson_asgi', True), mock.patch.object(model_admin, 'geojson_async', True):
+            response = await c.get('/admin/tests/deliveryjob/')
+            self.assertContains(response, '"geojson_url": "/admin/tests/deliveryjob/geojson/asgi/?')
+            # options not supported by the asynchronous view are served by the synchronous one
+            for patches in ({'geojson_cluster': True}, {'geojson_delta': True}, {'geojson_format': 'compact'}, {'geojson_cache': 'leaflet'}):
+                with mock.patch.multiple(model_admin, **patches):
+                    response = await c.get('/admin/tests/deliveryjob/')
+                    self.assertContains(response, '"geojson_url": "/admin/tests/deliveryjob/geojson/?')
+
+    def test_033_admin_related_objects(self):
+        """Test whether related objects used by feature hooks are loaded together with objects"""
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[DeliveryJob]
+        for job, waypoint in zip(self.delivery_jobs, self.waypoints):
+            job.waypoint = waypoint
+            job.save()
+
+        def tooltip(self, request, name, o, queryset):
+            return '%s: %s' % (o, o.waypoint)
+
+        url = '/admin/tests/deliveryjob/geojson/'
+        with mock.patch.object(DeliveryJobAdmin, 'get_geojson_feature_tooltip', tooltip), mock.patch.object(model_admin, 'geojson_query_guard', True):
+            with self.assertWarns(FeatureQueriesWarning), CaptureQueriesContext(connection) as queries:
+                response = c.get(url)
+            features = json.loads(response.content)['features']
+            self.assertIn('%s: %s' % (self.delivery_jobs[0], self.waypoints[0]), {f['properties']['tooltip'] for f in features})
+            # queries besides ones issued for every object
+            other = len(queries) - len(self.delivery_jobs)
+            for patches in (
+                {'geojson_select_related': ['waypoint']},
+                {'geojson_prefetch_related': ['waypoint']},
+                {'geojson_infer_related': True, 'list_display': ['name', 'waypoint']},
+                {'geojson_prefetch_related': ['waypoint'], 'geojson_only_fields': ['name']},
+                {'geojson_prefetch_related': [Prefetch('waypoint')], 'geojson_only_fields': ['name']},
+                {'geojson_prefetch_related': [Prefetch('waypoint')], 'geojson_infer_related': True, 'list_display': ['name', 'waypoint']},
+            ):
+                with mock.patch.multiple(model_admin, **patches), warnings.catch_warnings():
+                    warnings.simplefilter('error', FeatureQueriesWarning)
+                    with CaptureQueriesContext(connection) as queries:
+                        response = c.get(url)
+                    self.assertLessEqual(len(queries), other + 1)
+                    self.assertEqual(json.loads(response.content)['features'], features)
+
+        # reverse relations are prefetched without loading their names as fields
+        waypoint_admin = admin.site._registry[Waypoint]
+        for prefetch_related in (['delivery_jobs'], [Prefetch('delivery_jobs', queryset=DeliveryJob.objects.order_by('pk'))]):
+            with mock.patch.multiple(waypoint_admin, geojson_prefetch_related=prefetch_related, geojson_only_fields=['name']):
+                self.assertEqual(c.get('/admin/tests/waypoint/geojson/').status_code, 200)
+
+    def test_034_admin_extent(self):
+        """Test whether the extent of objects shown on the map is computed by the database and passed to the map"""
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[DeliveryJob]
+
+        def get_extent(query):
+            response = c.get('/admin/tests/deliveryjob/', query)
+            return json.loads(re.search(r'id="leaflet_admin_list_config">(.*?)</script>', response.content.decode('utf-8')).group(1))['geojson_extent']
+
+        def expected_extent(objects):
+            points = [p for o in objects for p in (o.pickup_point, o.dropoff_point)]
+            return [min(p.x for p in points), min(p.y for p in points), max(p.x for p in points), max(p.y for p in points)]
+
+        self.assertIsNone(get_extent({}))
+        expected = expected_extent(self.delivery_jobs)
+        bbox = '50.015,50.015,50.055,50.055'
+        spec = BoundingBoxFilter(None, {}, DeliveryJob, model_admin)
+        expected_filtered = expected_extent(spec.filter_bbox(None, DeliveryJob.objects.all(), spec.get_bbox(bbox)))
+        with mock.patch.object(model_admin, 'geojson_extent', True):
+            for viewport in (False, True):
+                with mock.patch.object(model_admin, 'geojson_viewport', viewport):
+                    for a, b in zip(get_extent({}), expected):
+                        self.assertAlmostEqual(a, b, places=4)
+                    for a, b in zip(get_extent({'bounding_box': bbox}), expected_filtered):
+                        self.assertAlmostEqual(a, b, places=4)
+            # the extent of the whole table is estimated by the table statistics
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE %s' % DeliveryJob._meta.db_table)
+            with mock.patch.object(model_admin, 'geojson_viewport', True), mock.patch.object(model_admin, 'geojson_extent_estimate_threshold', 0):
+                with CaptureQueriesContext(connection) as queries:
+                    extent = get_extent({})
+                self.assertTrue(any('ST_EstimatedExtent' in q['sql'] for q in queries.captured_queries))
+                for a, b in zip(extent, expected):
+                    self.assertAlmostEqual(a, b, places=0)
+        script = open(finders.find('leaflet_admin_list/leaflet_admin_list.js')).read()
+        self.assertIn('var extent = config.geojson_extent;', script)
+
+    def test_035_admin_custom_changelist(self):
+        """Test whether the changelist class of the parent admin is kept by the mixin"""
+        class CustomChangeList(ChangeList):
+            custom = True
+
+        class CustomAdmin(admin.ModelAdmin):
+            def get_changelist(self, request, **kwargs):
+                return CustomChangeList
+
+        model_admin = type('CustomDeliveryJobAdmin', (LeafletAdminListMixin, CustomAdmin), {})(DeliveryJob, admin.site)
+        changelist = model_admin.get_changelist(None)
+        self.assertTrue(issubclass(changelist, LeafletChangeList))
+        self.assertTrue(issubclass(changelist, CustomChangeList))
+        self.assertIs(model_admin.get_changelist(None), changelist)
+        self.assertTrue(issubclass(admin.site._registry[DeliveryJob].get_changelist(None), LeafletChangeList))
+
+    def test_036_admin_page_query_without_inline_map(self):
+        """Test whether the page query is prepared for the map only if the feature list is rendered inside the page"""
+        c = Client()
+        c.login(username='user', password='password')
+        model_admin = admin.site._registry[DeliveryJob]
+        with mock.patch.object(model_admin, 'geojson_database_side', True):
+            for patches, inline in (({}, True), ({'geojson_async': True}, False), ({'geojson_viewport': True}, False), ({'geojson_tiles': True}, False)):
+                with mock.patch.multiple(model_admin, **patches), CaptureQueriesContext(connection) as queries:
+                    c.get('/admin/tests/deliveryjob/')
+                self.assertEqual(any('ST_ASGEOJSON' in q['sql'].upper() for q in queries.captured_queries), inline)
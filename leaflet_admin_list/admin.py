@@ -1,50 +1,738 @@
 import functools
+import hashlib
+import itertools
 import json
-import operator
+import time
+import uuid
 
+from django import forms
+from django.conf import settings
+from django.contrib.admin.options import (
+    IS_POPUP_VAR,
+    IncorrectLookupParameters,
+)
 from django.contrib.gis.db.models import GeometryField
-from django.urls import reverse
-from django.utils.translation import gettext_lazy as _
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.contrib.gis.geos import Polygon
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.exceptions import (
+    EmptyResultSet,
+    FieldDoesNotExist,
+    PermissionDenied,
+)
+from django.db import connections, models
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Cast
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from django.urls import path, reverse
+from django.utils import translation
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    set_response_etag,
+)
+from django.utils.http import http_date
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _, gettext_lazy
 
+from . import cache, timing, vendor
+from .asynchronous import merge
+from .cluster import field_size, grid_clusters, grid_size
+from .compact import CompactEncoder
+from .context import FeatureContext
+from .encoder import (
+    RawJSON,
+    aiterencode,
+    dumps,
+    iterencode,
+    script_dumps,
+    script_escape,
+)
+from .extent import get_estimated_extent, get_extent
 from .filters import BoundingBoxFilter
+from .functions import SimplifyPreserveTopology
+from .mvt import (
+    BUFFER,
+    EXTENT,
+    encode_layer,
+    tile_bounds,
+    tile_lonlat_bounds,
+    tile_transform,
+)
+from .paginator import EstimatedPaginator, estimate_count
+from .queries import QueryGuard
 from .version import __version__
+from .views import leaflet_changelist
+
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:  # pragma: no cover
+    sync_to_async = None
+
+
+#: query parameters of the feature list view, not passed to the changelist
+MAP_BBOX_VAR = 'map_bbox'
+MAP_ZOOM_VAR = 'map_zoom'
+MAP_VERSION_VAR = 'map_version'
+EXPORT_FORMAT_VAR = '_export'
+
+#: name of the annotation containing the GeoJSON text of the geometry field built by the database
+GEOJSON_ANNOTATION = '_geojson_%s'
+#: number of objects whose cached features are requested from the cache at once
+GEOJSON_CACHE_BATCH = 1000
+
+#: content types of export formats
+EXPORT_CONTENT_TYPES = {
+    'geojson': 'application/geo+json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def get_related_lookup(model, name):
+    '''returns a `(lookup, many)` tuple, where the `lookup` is the longest chain of relations of the `list_display` item `name`
+    of the `model` (empty if there are no relations), and `many` tells that the chain contains multi-valued relations'''
+    path = []
+    many = False
+    opts = model._meta
+    for part in name.split(LOOKUP_SEP):
+        try:
+            field = opts.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+        path.append(part)
+        many = many or field.many_to_many or field.one_to_many
+        opts = field.related_model._meta
+    return LOOKUP_SEP.join(path), many
+
+
+def get_prefetch_through(lookup):
+    '''returns the lookup path of the `prefetch_related` argument, either the string or the `Prefetch` instance'''
+    return lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+
+
+def get_concrete_field_name(model, name):
+    '''returns the `name` if it is the concrete field of the `model` (f.e. the forward foreign key),
+    or None for reverse relations and other names'''
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return name if getattr(field, 'concrete', False) else None
+
+
+def round_coordinates(geometry, precision):
+    '''rounds coordinates of the GeoJSON `geometry` to `precision` decimal digits in place'''
+    def rounded(coordinates):
+        if isinstance(coordinates, (list, tuple)):
+            return [rounded(c) for c in coordinates]
+        return round(coordinates, precision)
+    if 'coordinates' in geometry:
+        geometry['coordinates'] = rounded(geometry['coordinates'])
+    for g in geometry.get('geometries', []):
+        round_coordinates(g, precision)
+    return geometry
 
 
 class LeafletAdminListMixin(object):
     #: overriding list view default template
     change_list_template = 'leaflet_admin_list/leaflet_admin_list.html'
+    #: build the GeoJSON text of geometries on the database side instead of the python side
+    geojson_database_side = False
+    #: number of decimal digits of coordinates in the feature list, 8 for the database side and not limited otherwise if None
+    geojson_precision = None
+    #: simplification tolerance of geometries in pixels on the map, geometries are not simplified if None
+    geojson_simplify = None
+    #: fields (besides the primary key and geometry fields) loaded to produce the feature list by the separate view, all if None
+    geojson_only_fields = None
+    #: related objects loaded together with objects to produce the feature list by the separate view
+    geojson_select_related = ()
+    #: related objects prefetched for objects to produce the feature list by the separate view
+    geojson_prefetch_related = ()
+    #: load related objects shown in the `list_display` together with objects to produce the feature list
+    geojson_infer_related = False
+    #: position the map by the extent of objects computed by the database before features are loaded
+    geojson_extent = False
+    #: number of objects in the table starting from which the extent of the whole table is estimated by the table statistics
+    geojson_extent_estimate_threshold = 100000
+    #: warn if feature hooks issue queries for every object (see `leaflet_admin_list.queries`), follows the DEBUG setting if None
+    geojson_query_guard = None
+    #: load the feature list asynchronously from the separate view instead of including it into the changelist page
+    geojson_async = False
+    #: load features inside the current map view from the separate view instead of the current changelist page
+    geojson_viewport = False
+    #: maximal number of objects returned for the map view
+    geojson_viewport_limit = 1000
+    #: show clusters instead of objects when the map view contains more objects than `geojson_viewport_limit`
+    geojson_cluster = False
+    #: size of the cluster grid cell on the map in pixels
+    geojson_cluster_size = 60
+    #: show objects on the map using vector tiles instead of the feature list
+    geojson_tiles = False
+    #: alias of the Django cache keeping feature lists and features, nothing is cached if None
+    geojson_cache = None
+    #: timeout of cached feature lists and features in seconds
+    geojson_cache_timeout = DEFAULT_TIMEOUT
+    #: format of the feature list sent to the map, 'geojson' or 'compact' (see `leaflet_admin_list.compact`)
+    geojson_format = 'geojson'
+    #: record times of stages producing the map data, see `leaflet_admin_list.timing`
+    geojson_timing = False
+    #: show recorded times on the map
+    geojson_timing_overlay = False
+    #: refresh the map shown by the separate view sending only features changed since the previous refresh
+    geojson_delta = False
+    #: rendering of features on the map: 'dom' draws points as markers with icons, 'canvas' draws all features
+    #: on the canvas and points as circles, 'webgl' draws points by the WebGL layer and other features on the canvas
+    geojson_render = 'dom'
+    #: parse the feature list in the Web Worker and add features to the map in chunks, one chunk per animation frame
+    geojson_worker = False
+    #: number of features added to the map in one animation frame when `geojson_worker` is set
+    geojson_worker_chunk_size = 1000
+    #: estimate the number of objects in the changelist filtered by the area (see `leaflet_admin_list.paginator`)
+    geojson_count_estimate = False
+    #: number of objects counted exactly when `geojson_count_estimate` is set
+    geojson_count_threshold = 10000
+    #: allow to export all objects of the changelist as GeoJSON or newline-delimited GeoJSON by the action or the link
+    geojson_export = False
+    #: number of objects fetched by the server-side cursor at once while exporting
+    geojson_export_chunk_size = 2000
+    #: load the feature list from the asynchronous view querying geometry fields concurrently (Django 4.2+ under ASGI)
+    geojson_asgi = False
+    #: number of objects fetched at once by the `geojson_asgi` view, features of fetched objects are produced by the synchronous code
+    geojson_asgi_chunk_size = 1000
 
-    class Media:
-        css = {'all': [
-            'leaflet/leaflet.css',
-            'leaflet/draw/leaflet.draw.css',
-            '//cdn.jsdelivr.net/npm/leaflet-mouse-position/src/L.Control.MousePosition.css',
-        ]}
-        js = [
-            'leaflet/leaflet.js',
-            'leaflet/draw/leaflet.draw.js',
-            'leaflet/leaflet.extras.js',
-            'leaflet/leaflet.forms.js',
-            '//cdn.jsdelivr.net/npm/leaflet-mouse-position/src/L.Control.MousePosition.js',
-            '//cdnjs.cloudflare.com/ajax/libs/leaflet-plugins/3.3.1/control/Permalink.min.js',
-            '//cdnjs.cloudflare.com/ajax/libs/Colors.js/1.2.4/colors.min.js',
-        ]
+    @property
+    def media(self):
+        '''Overriden to add the map script and plugins, see `leaflet_admin_list.vendor`'''
+        return super().media + forms.Media(
+            css={'all': [
+                'leaflet/leaflet.css',
+                'leaflet/draw/leaflet.draw.css',
+                *vendor.css(),
+            ]},
+            js=[
+                'leaflet/leaflet.js',
+                'leaflet/draw/leaflet.draw.js',
+                'leaflet/leaflet.extras.js',
+                'leaflet/leaflet.forms.js',
+                *vendor.js(),
+                'leaflet_admin_list/leaflet_admin_list.js',
+            ],
+        )
 
     def changelist_view(self, request, extra_context=None):
         '''Overriden to modify changelist view'''
-        q = self.model.objects.all().none()
-        try:
-            cl = self.get_changelist_instance(request)
-            q = cl.result_list
-        except Exception:
-            pass
-
         extra_context = {
             **(extra_context or {}),
-            'geojson': json.dumps(self.get_geojson_feature_list(request, q)),
             'version': __version__,
+            'geojson_render': self.geojson_render,
+        }
+        if self.geojson_tiles:
+            extra_context['geojson_tiles_url'] = '%stiles/{z}/{x}/{y}.mvt?%s' % (reverse('admin:%s_%s_changelist' % (
+                self.model._meta.app_label,
+                self.model._meta.model_name,
+            ), current_app=self.admin_site.name), request.GET.urlencode())
+            extra_context['geojson_change_url'] = self.get_geojson_context(request, None).change_url_template
+            extra_context['geojson_tiles_layers'] = self.get_geojson_geometry_fields(request, None, self.model.objects.none())
+            extra_context['geojson_plugin_url'] = vendor.optional_url('Leaflet.VectorGrid.bundled.js')
+        elif self.geojson_async or self.geojson_viewport:
+            extra_context['geojson_viewport'] = self.geojson_viewport
+            extra_context['geojson_delta'] = self.geojson_delta
+            extra_context['geojson_url'] = '%s?%s' % (reverse('admin:%s_%s_%s' % (
+                self.model._meta.app_label,
+                self.model._meta.model_name,
+                'geojson_asgi' if self.is_geojson_asgi(request) else 'geojson',
+            ), current_app=self.admin_site.name), request.GET.urlencode())
+        if self.geojson_export:
+            url = reverse('admin:%s_%s_export' % (
+                self.model._meta.app_label,
+                self.model._meta.model_name,
+            ), current_app=self.admin_site.name)
+            for name in EXPORT_CONTENT_TYPES:
+                query = request.GET.copy()
+                query[EXPORT_FORMAT_VAR] = name
+                extra_context['geojson_export_%s_url' % name] = '%s?%s' % (url, query.urlencode())
+        if self.geojson_render == 'webgl' and not self.geojson_tiles:
+            extra_context['geojson_plugin_url'] = vendor.optional_url('glify-browser.js')
+        if self.geojson_timing:
+            timing.start(request)
+            extra_context['geojson_timing_overlay'] = self.geojson_timing_overlay
+        # the feature list is rendered inside the page unless the map loads features from separate views
+        inline = request._leaflet_admin_list_inline = not {'geojson_tiles_url', 'geojson_url'} & set(extra_context)
+        with timing.stage(request, 'changelist'):
+            response = super().changelist_view(request, extra_context)
+        context_data = getattr(response, 'context_data', None) or {}
+        cl = context_data.get('cl')
+        if cl is not None and inline:
+            # the map shares the page queryset with the list, so the page is fetched only once
+            context_data['geojson'] = script_escape(''.join(self.get_geojson_feature_list_chunks(request, cl.result_list)))
+        if cl is not None and self.geojson_extent:
+            # the map shows either the current page or all objects inside the map view
+            queryset = cl.queryset if self.geojson_tiles or self.geojson_viewport else cl.result_list
+            with timing.stage(request, 'extent'):
+                extent = self.get_geojson_extent(request, queryset)
+            context_data['geojson_extent'] = None if extent is None else list(extent)
+        timings = timing.get_timings(request)
+        if timings is not None:
+            context_data['geojson_timing'] = timings.server_timing()
+        if cl is not None:
+            context_data['geojson_config'] = script_dumps(self.get_map_config(request, context_data))
+        if timings is not None and hasattr(response, 'render'):
+            with timing.stage(request, 'render'):
+                response.render()
+            response['Server-Timing'] = timings.server_timing()
+            timing.finish(self, request)
+        return response
+
+    def get_map_config(self, request, context):
+        '''returns the configuration of the map script made of the changelist page `context`'''
+        opts = self.model._meta
+        return {
+            'version': __version__,
+            'geojson_url': context.get('geojson_url'),
+            'geojson_viewport': context.get('geojson_viewport', False),
+            'geojson_delta': context.get('geojson_delta', False),
+            'geojson_tiles_url': context.get('geojson_tiles_url'),
+            'geojson_tiles_layers': list(context.get('geojson_tiles_layers', [])),
+            'geojson_change_url': context.get('geojson_change_url'),
+            'geojson_extent': context.get('geojson_extent'),
+            'geojson_render': self.geojson_render,
+            'geojson_worker': self.geojson_worker,
+            'geojson_worker_chunk_size': self.geojson_worker_chunk_size,
+            'geojson_timing': context.get('geojson_timing', ''),
+            'geojson_timing_overlay': context.get('geojson_timing_overlay', False),
+            'messages': {
+                'osm': _('Open Street Map Tiles'),
+                'view_edit': _('View/Edit %(model_verbose_name)s') % {'model_verbose_name': opts.verbose_name},
+                'verbose_name': str(capfirst(opts.verbose_name)),
+                'truncated': _('Not all objects are shown, zoom in to see more'),
+                'version_title': _('Django Leaflet Admin List Version %(version)s') % {'version': __version__},
+                'version': _('DLAList v.%(version)s') % {'version': __version__},
+                'zoom_in': _('Zoom In'),
+                'zoom_out': _('Zoom Out'),
+                'permalink': _('Permanent Link'),
+                'bbox_color': _('Bounding Box color'),
+            },
+        }
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        '''Overriden to estimate the number of objects filtered by the area if requested'''
+        if self.geojson_count_estimate and self.has_area_filter(request):
+            return EstimatedPaginator(queryset, per_page, orphans, allow_empty_first_page, threshold=self.geojson_count_threshold)
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+
+    def has_area_filter(self, request):
+        '''returns True if objects are filtered by the area on the map or by an area filter'''
+        if getattr(request, '_leaflet_admin_list_area', False):
+            return True
+        return any(
+            isinstance(f, type) and issubclass(f, BoundingBoxFilter) and request.GET.get(f.parameter_name)
+            for f in self.get_list_filter(request)
+        )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.geojson_cache is not None:
+            # any process saving objects, not only one serving the map, should change the version of the cached data
+            cache.register(self.model, self.geojson_cache)
+
+    def get_changelist(self, request, **kwargs):
+        '''Overriden to share the page queryset between the list and the map, the changelist class of the parent
+        is extended by the `LeafletChangeList`'''
+        return leaflet_changelist(super().get_changelist(request, **kwargs))
+
+    def get_urls(self):
+        '''Overriden to add the feature list view'''
+        def wrap(view):
+            def wrapper(*args, **kwargs):
+                return self.admin_site.admin_view(view, cacheable=True)(*args, **kwargs)
+            wrapper.model_admin = self
+            return functools.update_wrapper(wrapper, view)
+
+        def wrap_async(view):
+            async def wrapper(request, *args, **kwargs):
+                # the same as the `admin_view` does for synchronous views
+                if not await sync_to_async(self.admin_site.has_permission)(request):
+                    # inner import as the `admin_view` does, to not import the user model too early
+                    from django.contrib.auth.views import redirect_to_login
+                    return redirect_to_login(request.get_full_path(), reverse('admin:login', current_app=self.admin_site.name))
+                return await view(request, *args, **kwargs)
+            wrapper.model_admin = self
+            return functools.update_wrapper(wrapper, view)
+
+        info = self.model._meta.app_label, self.model._meta.model_name
+        urls = [
+            path('geojson/', wrap(self.geojson_view), name='%s_%s_geojson' % info),
+            path('tiles/<int:z>/<int:x>/<int:y>.mvt', wrap(self.tile_view), name='%s_%s_tiles' % info),
+            path('export/', wrap(self.export_view), name='%s_%s_export' % info),
+        ]
+        if sync_to_async is not None:
+            urls.append(path('geojson/asgi/', wrap_async(self.geojson_asgi_view), name='%s_%s_geojson_asgi' % info))
+        return urls + super().get_urls()
+
+    def geojson_view(self, request):
+        '''returns the GeoJSON `FeatureList` for the same query as the changelist view'''
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        request.GET = request.GET.copy()
+        bbox = request.GET.pop(MAP_BBOX_VAR, [None])[-1]
+        zoom = request.GET.pop(MAP_ZOOM_VAR, [None])[-1]
+        version = request.GET.pop(MAP_VERSION_VAR, [None])[-1]
+        # the changelist of the map view is counted as if it is filtered by the area
+        request._leaflet_admin_list_area = bbox is not None
+        # the map view shows objects of the whole filtered queryset, not of the page
+        request._leaflet_admin_list_unpaged = bbox is not None
+        if self.geojson_timing:
+            timing.start(request)
+        try:
+            with timing.stage(request, 'changelist'):
+                cl = self.get_changelist_instance(request)
+            zoom = None if zoom is None else int(zoom)
+        except (IncorrectLookupParameters, ValueError):
+            return HttpResponseBadRequest()
+        self.get_geojson_context(request, None).zoom = zoom
+
+        filtered = None
+        clustered = False
+        if bbox is None:
+            queryset = self.get_geojson_queryset(request, cl.result_list)
+        else:
+            spec = self.get_bbox_filter(request, cl)
+            polygon = spec.get_bbox(bbox)
+            if polygon is None:
+                return HttpResponseBadRequest()
+            limit = self.geojson_viewport_limit
+            filtered = spec.filter_bbox(request, cl.queryset, polygon)
+            if self.geojson_cluster and zoom is not None and filtered[limit:].exists():
+                queryset = filtered.order_by()
+                clustered = True
+            else:
+                queryset = self.get_geojson_queryset(request, filtered[:limit])
+
+        etag = last_modified = None
+        if not self.geojson_delta:
+            # the delta depends on the feature list received by the client before
+            etag = self.get_geojson_etag(request, queryset)
+            last_modified = self.get_geojson_last_modified(request, queryset)
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return response
+
+        if clustered:
+            chunks = [dumps(self.get_geojson_cluster_list(request, queryset, zoom))]
+        else:
+            members = {}
+            if filtered is not None:
+                with timing.stage(request, 'query'):
+                    members['truncated'] = len(queryset) >= limit and filtered[limit:].exists()
+            if self.geojson_delta:
+                chunks = self.get_geojson_delta_chunks(request, queryset, version, **members)
+            else:
+                chunks = self.get_geojson_feature_list_chunks(request, queryset, **members)
+        if etag:
+            response = StreamingHttpResponse(timing.streamed(self, request, chunks), content_type='application/json')
+            response['ETag'] = etag
+        else:
+            response = HttpResponse(''.join(chunks), content_type='application/json')
+            set_response_etag(response)
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        timings = timing.get_timings(request)
+        if timings is not None:
+            # the streamed response has only times of stages passed before the streaming
+            response['Server-Timing'] = timings.server_timing()
+            if not response.streaming:
+                timing.finish(self, request)
+        # the browser may keep the response but should always revalidate it
+        patch_cache_control(response, private=True, no_cache=True)
+        return get_conditional_response(request, etag=response['ETag'], last_modified=last_modified, response=response)
+
+    def is_geojson_asgi(self, request):
+        '''returns True if the map loads the feature list from the `geojson_asgi_view`, which is used only if the `geojson_asgi`
+        is set and options not supported by the view (clusters, the incremental refresh, the compact format, the feature cache
+        and timings) are not set'''
+        if not self.geojson_asgi or sync_to_async is None:
+            return False
+        unsupported = (self.geojson_cluster, self.geojson_delta, self.geojson_format == 'compact', self.geojson_cache is not None, self.geojson_timing)
+        return not any(unsupported)
+
+    async def geojson_asgi_view(self, request):
+        '''the asynchronous variant of the `geojson_view`, features of every geometry field are produced
+        by the separate query, all queries are consumed concurrently, see `get_geojson_async_chunks`'''
+        try:
+            queryset, filtered = await sync_to_async(self.get_geojson_asgi_queryset)(request)
+        except (IncorrectLookupParameters, ValueError):
+            return HttpResponseBadRequest()
+        members = {}
+        if filtered is not None:
+            limit = self.geojson_viewport_limit
+            members['truncated'] = await filtered[:limit + 1].acount() > limit
+        response = StreamingHttpResponse(self.get_geojson_async_chunks(request, queryset, **members), content_type='application/json')
+        # the browser may keep the response but should always revalidate it
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_geojson_asgi_queryset(self, request):
+        '''returns the queryset of objects for the `geojson_asgi_view`, and the queryset filtered by the map view bounds
+        if they are given, resolving everything which needs the synchronous code'''
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        request.GET = request.GET.copy()
+        bbox = request.GET.pop(MAP_BBOX_VAR, [None])[-1]
+        zoom = request.GET.pop(MAP_ZOOM_VAR, [None])[-1]
+        request.GET.pop(MAP_VERSION_VAR, None)
+        request._leaflet_admin_list_area = bbox is not None
+        request._leaflet_admin_list_unpaged = bbox is not None
+        cl = self.get_changelist_instance(request)
+        self.get_geojson_context(request, None).zoom = None if zoom is None else int(zoom)
+        if bbox is None:
+            return self.get_geojson_queryset(request, cl.result_list), None
+        spec = self.get_bbox_filter(request, cl)
+        polygon = spec.get_bbox(bbox)
+        if polygon is None:
+            raise ValueError('Malformed %s parameter' % MAP_BBOX_VAR)
+        filtered = spec.filter_bbox(request, cl.queryset, polygon)
+        return self.get_geojson_queryset(request, filtered[:self.geojson_viewport_limit]), filtered
+
+    def get_geojson_async_chunks(self, request, queryset, **members):
+        '''returns the asynchronous iterator of chunks of the GeoJSON text of the `FeatureList` instance
+        representing a `queryset`, with additional `members` of the `FeatureList`'''
+        feature_list = {
+            'type': 'FeatureCollection',
+            'features': merge(*[
+                self.get_geojson_async_features(request, name, queryset)
+                for name in self.get_geojson_geometry_fields(request, None, queryset)
+            ]),
+        }
+        feature_list.update(members)
+        return aiterencode(feature_list)
+
+    async def get_geojson_async_features(self, request, name, queryset):
+        '''yields GeoJSON `Feature` instances representing the geometry field `name` of objects of a `queryset`
+        asynchronously, other geometry fields are not loaded'''
+        others = [n for n in self.get_geojson_geometry_fields(request, None, queryset) if n != name]
+        get_features = sync_to_async(self.get_geojson_batch_features)
+        batch = []
+        async for o in queryset.defer(*others).aiterator(chunk_size=self.geojson_asgi_chunk_size):
+            batch.append(o)
+            if len(batch) >= self.geojson_asgi_chunk_size:
+                for feature in await get_features(request, name, batch, queryset):
+                    yield feature
+                batch = []
+        for feature in await get_features(request, name, batch, queryset):
+            yield feature
+
+    def get_geojson_batch_features(self, request, name, objects, queryset):
+        '''returns GeoJSON `Feature` instances representing the geometry field `name` of `objects` fetched
+        by the `get_geojson_async_features`, called synchronously, so feature hooks may query the database'''
+        return [feature for feature in (self.get_geojson_feature(request, name, o, queryset) for o in objects) if feature]
+
+    def export_view(self, request):
+        '''streams all objects of the same query as the changelist view in the format given by the `_export` parameter'''
+        if not self.geojson_export:
+            raise Http404
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        request.GET = request.GET.copy()
+        format = request.GET.pop(EXPORT_FORMAT_VAR, ['geojson'])[-1]
+        if format not in EXPORT_CONTENT_TYPES:
+            return HttpResponseBadRequest()
+        request._leaflet_admin_list_unpaged = True
+        try:
+            cl = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            return HttpResponseBadRequest()
+        return self.get_geojson_export_response(request, cl.queryset, format)
+
+    def get_actions(self, request):
+        '''Overriden to add export actions'''
+        actions = super().get_actions(request)
+        if self.actions is None or IS_POPUP_VAR in request.GET:
+            # actions are disabled
+            return actions
+        if not self.geojson_export or not self.has_view_or_change_permission(request):
+            return actions
+        for name in ('export_geojson', 'export_ndjson'):
+            func = getattr(type(self), name)
+            actions[name] = (func, name, func.short_description)
+        return actions
+
+    def export_geojson(self, request, queryset):
+        '''the action streaming selected objects as the GeoJSON `FeatureList`'''
+        return self.get_geojson_export_response(request, queryset, 'geojson')
+    export_geojson.short_description = gettext_lazy('Export selected %(verbose_name_plural)s as GeoJSON')
+
+    def export_ndjson(self, request, queryset):
+        '''the action streaming selected objects as newline-delimited GeoJSON features'''
+        return self.get_geojson_export_response(request, queryset, 'ndjson')
+    export_ndjson.short_description = gettext_lazy('Export selected %(verbose_name_plural)s as newline-delimited GeoJSON')
+
+    def get_geojson_export_response(self, request, queryset, format):
+        '''returns the streaming response exporting all objects of a `queryset` in the `format` (see `EXPORT_CONTENT_TYPES`)'''
+        response = StreamingHttpResponse(self.get_geojson_export_chunks(request, queryset, format), content_type=EXPORT_CONTENT_TYPES[format])
+        response['Content-Disposition'] = 'attachment; filename="%s.%s"' % (self.model._meta.model_name, format)
+        return response
+
+    def get_geojson_export_chunks(self, request, queryset, format):
+        '''yields chunks of the exported text representing a `queryset`, objects are fetched by the server-side cursor
+        in chunks of `geojson_export_chunk_size`, so the memory used doesn't depend on the number of objects'''
+        queryset = self.get_geojson_queryset(request, queryset)
+
+        def features():
+            guard = self.get_geojson_query_guard(request, queryset)
+            for o in queryset.iterator(chunk_size=self.geojson_export_chunk_size):
+                yield from guard.measure(self.get_geojson_features, request, o, queryset)
+            guard.check()
+
+        features = features()
+        if format == 'geojson':
+            yield from iterencode({'type': 'FeatureCollection', 'features': features})
+            return
+        chunk = []
+        for feature in features:
+            chunk.append(dumps(feature))
+            if len(chunk) >= self.geojson_export_chunk_size:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+
+    def tile_view(self, request, z, x, y):
+        '''returns the Mapbox Vector Tile for the same query as the changelist view'''
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        if z > 30 or x >= 1 << z or y >= 1 << z:
+            return HttpResponseBadRequest()
+        if self.geojson_timing:
+            timing.start(request)
+        request._leaflet_admin_list_area = True
+        request._leaflet_admin_list_unpaged = True
+        try:
+            with timing.stage(request, 'changelist'):
+                cl = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            return HttpResponseBadRequest()
+        spec = self.get_bbox_filter(request, cl)
+        polygon = Polygon.from_bbox(tile_lonlat_bounds(z, x, y, BUFFER))
+        polygon.srid = 4326
+        queryset = spec.filter_bbox(request, cl.queryset.order_by(), polygon)
+        tile = timing.measure(request, 'tile', self.get_tile, request, queryset, z, x, y)
+        response = HttpResponse(tile, content_type='application/vnd.mapbox-vector-tile')
+        patch_cache_control(response, private=True, no_cache=True)
+        timings = timing.finish(self, request)
+        if timings is not None:
+            response['Server-Timing'] = timings.server_timing()
+        return response
+
+    def get_tile(self, request, queryset, z, x, y):
+        '''returns the Mapbox Vector Tile content representing a `queryset`, one layer per geometry field'''
+        return b''.join(
+            self.get_tile_layer(request, name, queryset, z, x, y)
+            for name in self.get_geojson_geometry_fields(request, None, queryset)
+        )
+
+    def get_tile_layer(self, request, name, queryset, z, x, y):
+        '''returns the Mapbox Vector Tile layer representing the geometry field `name` of objects from a `queryset`'''
+        queryset = queryset.filter(**{'%s__isnull' % name: False})
+        if getattr(connections[queryset.db].ops, 'postgis', False):
+            return self.get_tile_layer_postgis(request, name, queryset, z, x, y)
+        return self.get_tile_layer_python(request, name, queryset, z, x, y)
+
+    def get_tile_layer_python(self, request, name, queryset, z, x, y):
+        '''returns the Mapbox Vector Tile layer built on the python side for databases other than PostGIS'''
+        transform = tile_transform(z, x, y)
+        clip = Polygon.from_bbox(tile_bounds(z, x, y, BUFFER))
+        clip.srid = 3857
+        features = []
+        for pk, geometry in queryset.values_list('pk', name).iterator():
+            geometry = geometry.transform(3857, clone=True).intersection(clip)
+            if geometry.empty:
+                continue
+            features.append((geometry, {
+                'field': name,
+                'pk': pk if isinstance(pk, (int, str)) else str(pk),
+            }))
+        return encode_layer(name, features, transform)
+
+    def get_tile_layer_postgis(self, request, name, queryset, z, x, y):
+        '''returns the Mapbox Vector Tile layer built by the PostGIS `ST_AsMVT` function'''
+        connection = connections[queryset.db]
+        qn = connection.ops.quote_name
+        opts = queryset.model._meta
+        pk = opts.pk
+        pks, params = queryset.values('pk').query.sql_with_params()
+        sql = (
+            'SELECT ST_AsMVT(tile, %%s, %(extent)s, \'geom\') FROM ('
+            'SELECT ST_AsMVTGeom(ST_Transform(t.%(column)s::geometry, 3857), ST_TileEnvelope(%%s, %%s, %%s), %(extent)s, %(buffer)s, true) AS geom, '
+            't.%(pk)s%(pk_cast)s AS pk, %%s::text AS field '
+            'FROM %(table)s t WHERE t.%(pk)s IN (%(pks)s)'
+            ') tile WHERE geom IS NOT NULL'
+        ) % {
+            'extent': EXTENT,
+            'buffer': BUFFER,
+            'column': qn(opts.get_field(name).column),
+            'pk': qn(pk.column),
+            'pk_cast': '' if isinstance(pk, (models.AutoField, models.IntegerField)) else '::text',
+            'table': qn(opts.db_table),
+            'pks': pks,
         }
-        return super().changelist_view(request, extra_context)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [name, z, x, y, name] + list(params))
+            row = cursor.fetchone()
+        return bytes(row[0]) if row and row[0] else b''
+
+    def get_bbox_filter(self, request, cl):
+        '''returns the bounding box filter instance used by the changelist `cl`'''
+        for spec in cl.filter_specs:
+            # polygon and distance filters are bounding box filters parsing other values
+            if isinstance(spec, BoundingBoxFilter) and spec.html_class == BoundingBoxFilter.html_class:
+                return spec
+
+    def get_geojson_etag(self, request, queryset):
+        '''returns an ETag of the feature list for the `queryset` if it may be known before the feature list is built'''
+        key = self.get_geojson_cache_key(request, queryset, 'etag')
+        if key is not None:
+            return '"%s"' % key.rsplit(':', 1)[-1]
+
+    def get_geojson_cache_key(self, request, queryset, *parts):
+        '''returns the key of the data cached for a `queryset` and the current version of the model data,
+        or None if the data is not cached'''
+        query = getattr(queryset, 'query', None)
+        if self.geojson_cache is None or query is None:
+            return None
+        try:
+            sql, params = query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        return cache.make_key(
+            self.model._meta.label_lower, self.get_geojson_cache_version(request), self.get_geojson_cache_key_parts(request),
+            self.get_geojson_context(request, queryset).zoom, sql, [str(p) for p in params], parts,
+        )
+
+    def get_geojson_cache_key_parts(self, request):
+        '''returns a tuple of values the cached data depends on besides the query, the active language by default;
+        may be overriden to add f.e. the user if feature hooks depend on it'''
+        return (translation.get_language(),)
+
+    def get_geojson_cache_version(self, request):
+        '''returns the current version of the cached model data, registering the model to change the version on save or delete'''
+        cache.register(self.model, self.geojson_cache)
+        return cache.get_version(self.model, self.geojson_cache)
+
+    def get_geojson_last_modified(self, request, queryset):
+        '''returns a last modification `datetime` of the feature list for the `queryset` if known'''
+        pass
 
     def get_list_filter(self, request):
         '''Overriden to add the default Bounding Box Filter'''
@@ -52,16 +740,279 @@ class LeafletAdminListMixin(object):
         if not list_filter:
             list_filter = []
         for f in list_filter:
-            if isinstance(f, type) and issubclass(f, BoundingBoxFilter):
+            if isinstance(f, type) and issubclass(f, BoundingBoxFilter) and f.html_class == BoundingBoxFilter.html_class:
                 return list_filter
         # The BBFilter should always be present here
         return list(list_filter) + [BoundingBoxFilter]
 
+    def get_geojson_queryset(self, request, queryset):
+        '''returns a `queryset` prepared to produce the feature list'''
+        names = self.get_geojson_geometry_fields(request, None, queryset)
+        select_related, prefetch_related = self.get_geojson_related(request)
+        if self.geojson_only_fields is not None:
+            # related objects selected by the changelist can't be traversed unless loaded
+            queryset = queryset.select_related(None)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if self.geojson_only_fields is not None:
+            # foreign keys of prefetched objects should be loaded too
+            prefetched = [get_concrete_field_name(self.model, get_prefetch_through(lookup).split(LOOKUP_SEP)[0]) for lookup in prefetch_related]
+            prefetched = [name for name in prefetched if name]
+            queryset = queryset.only(*([queryset.model._meta.pk.name] + names + list(self.geojson_only_fields) + select_related + prefetched))
+        annotations = self.get_geojson_annotations(request, queryset)
+        if annotations:
+            queryset = queryset.annotate(**annotations).defer(*names)
+        return queryset
+
+    def get_geojson_related(self, request):
+        '''returns `(select_related, prefetch_related)` lists of related objects loaded together with objects
+        to produce the feature list, declared by `geojson_select_related` and `geojson_prefetch_related`,
+        and shown in the `list_display` if `geojson_infer_related` is set'''
+        select_related = list(self.geojson_select_related)
+        prefetch_related = list(self.geojson_prefetch_related)
+        if not self.geojson_infer_related:
+            return select_related, prefetch_related
+        for name in self.get_list_display(request):
+            if not isinstance(name, str):
+                continue
+            lookup, many = get_related_lookup(self.model, name)
+            if not lookup:
+                continue
+            related = prefetch_related if many else select_related
+            if not any(r == lookup or r.startswith(lookup + LOOKUP_SEP) for r in map(get_prefetch_through, related)):
+                related.append(lookup)
+        return select_related, prefetch_related
+
+    def get_geojson_extent(self, request, queryset):
+        '''returns the `(xmin, ymin, xmax, ymax)` extent of geometries of objects of a `queryset` shown on the map,
+        or None if there are no geometries, see `leaflet_admin_list.extent`'''
+        names = self.get_geojson_geometry_fields(request, None, queryset)
+        query = queryset.query
+        if not query.where and not query.low_mark and query.high_mark is None:
+            # the whole table
+            count = estimate_count(queryset)
+            if count is not None and count >= self.geojson_extent_estimate_threshold:
+                extent = get_estimated_extent(self.model, names, queryset.db)
+                if extent is not None:
+                    return extent
+        return get_extent(queryset, names)
+
+    def get_geojson_query_guard(self, request, queryset):
+        '''returns the `QueryGuard` counting queries issued by feature hooks for objects of a `queryset`'''
+        enabled = settings.DEBUG if self.geojson_query_guard is None else self.geojson_query_guard
+        return QueryGuard(self, queryset.db, enabled=enabled)
+
+    def get_geojson_annotations(self, request, queryset):
+        '''returns annotations to be added to a `queryset` to produce the feature list'''
+        if not self.geojson_database_side:
+            return {}
+        tolerance = self.get_geojson_simplify_tolerance(request, queryset)
+        annotations = {}
+        for name in self.get_geojson_geometry_fields(request, None, queryset):
+            expression = name
+            if tolerance:
+                field = self.model._meta.get_field(name)
+                if field.geography:
+                    expression = Cast(name, GeometryField(srid=field.srid))
+                expression = SimplifyPreserveTopology(expression, field_size(tolerance, field, connections[queryset.db]))
+            annotations[GEOJSON_ANNOTATION % name] = AsGeoJSON(expression, precision=8 if self.geojson_precision is None else self.geojson_precision)
+        return annotations
+
+    def get_geojson_simplify_tolerance(self, request, queryset):
+        '''returns the simplification tolerance of geometries in degrees for the current map zoom level, or None'''
+        zoom = self.get_geojson_context(request, queryset).zoom
+        if self.geojson_simplify and zoom is not None:
+            return grid_size(self.geojson_simplify, zoom)
+
     def get_geojson_feature_list(self, request, queryset):
         '''returns the whole GeoJSON `FeatureList` instance representing a `queryset`'''
         return {
             'type': 'FeatureCollection',
-            'features': functools.reduce(operator.add, (self.get_geojson_features(request, o, queryset) for o in queryset), [])
+            'features': list(self.get_geojson_feature_iterator(request, queryset)),
+        }
+
+    def get_geojson_feature_iterator(self, request, queryset):
+        '''yields GeoJSON `Feature` instances representing a `queryset`,
+        or their `RawJSON` text kept in the cache if the `geojson_cache` is set'''
+        if self.geojson_cache is None:
+            guard = self.get_geojson_query_guard(request, queryset)
+            for o in self.get_geojson_objects(request, queryset):
+                yield from guard.measure(timing.measure, request, 'features', self.get_geojson_features, request, o, queryset)
+            guard.check()
+            return
+        for pk, fragments in self.get_geojson_fragments(request, queryset):
+            for fragment in fragments:
+                yield RawJSON(fragment)
+
+    def get_geojson_fragments(self, request, queryset):
+        '''yields `(pk, fragments)` tuples for every object of a `queryset`, where `fragments` is a list of GeoJSON texts
+        of `Feature` instances representing the object, kept in the cache if the `geojson_cache` is set'''
+        guard = self.get_geojson_query_guard(request, queryset)
+        if self.geojson_cache is None:
+            for o in self.get_geojson_objects(request, queryset):
+                yield o.pk, [dumps(f) for f in guard.measure(timing.measure, request, 'features', self.get_geojson_features, request, o, queryset)]
+            guard.check()
+            return
+        backend = caches[self.geojson_cache]
+        label = self.model._meta.label_lower
+        version = self.get_geojson_cache_version(request)
+        key_parts = self.get_geojson_cache_key_parts(request)
+        zoom = self.get_geojson_context(request, queryset).zoom
+        objects = iter(self.get_geojson_objects(request, queryset))
+        while True:
+            batch = list(itertools.islice(objects, GEOJSON_CACHE_BATCH))
+            if not batch:
+                break
+            keys = [cache.make_key(label, version, key_parts, zoom, 'features', o.pk) for o in batch]
+            cached = backend.get_many(keys)
+            missing = {}
+            for key, o in zip(keys, batch):
+                fragments = cached.get(key)
+                if fragments is None:
+                    fragments = missing[key] = [
+                        dumps(f) for f in guard.measure(timing.measure, request, 'features', self.get_geojson_features, request, o, queryset)
+                    ]
+                yield o.pk, fragments
+            cache.stats['feature_hits'] += len(cached)
+            cache.stats['feature_misses'] += len(missing)
+            if missing:
+                backend.set_many(missing, self.geojson_cache_timeout)
+        guard.check()
+
+    def get_geojson_delta_chunks(self, request, queryset, version, **members):
+        '''yields chunks of the GeoJSON text of the `FeatureList` instance containing features of objects from a `queryset`
+        added or changed since the feature list `version` received by the client before, with a list of primary keys
+        of `removed` objects and additional `members` of the `FeatureList`'''
+        backend = caches[self.geojson_cache or 'default']
+        known = backend.get(cache.make_key('delta', version)) if version else None
+        digests = {}
+        current = uuid.uuid4().hex
+
+        def features():
+            for pk, fragments in self.get_geojson_fragments(request, queryset):
+                pk = pk if isinstance(pk, (int, str)) else str(pk)
+                digest = digests[pk] = hashlib.md5(''.join(fragments).encode('utf-8')).hexdigest()[:16]
+                if known is None or known.get(pk) != digest:
+                    for fragment in fragments:
+                        yield RawJSON(fragment)
+
+        def removed():
+            # called when all features have been produced
+            backend.set(cache.make_key('delta', current), digests, self.geojson_cache_timeout)
+            if known is not None:
+                yield from (pk for pk in known if pk not in digests)
+
+        feature_list = {
+            'type': 'FeatureCollection',
+            'version': current,
+            'delta': known is not None,
+            'features': features(),
+            'removed': removed(),
+        }
+        feature_list.update(members)
+        return timing.encode(request, iterencode(feature_list))
+
+    def get_geojson_objects(self, request, queryset):
+        '''returns objects of a `queryset` to produce features, fetched at once if times of the request are recorded'''
+        if timing.get_timings(request) is None:
+            return queryset
+        started = time.perf_counter()
+        objects = list(queryset)
+        timing.add(request, 'query', time.perf_counter() - started, len(objects))
+        return objects
+
+    def get_geojson_feature_list_chunks(self, request, queryset, **members):
+        '''yields chunks of the GeoJSON text of the `FeatureList` instance representing a `queryset`,
+        encoding features one by one, with additional `members` of the `FeatureList`'''
+        key = self.get_geojson_cache_key(request, queryset, 'list', sorted(members.items()))
+        if key is not None:
+            text = caches[self.geojson_cache].get(key)
+            cache.stats['list_hits' if text is not None else 'list_misses'] += 1
+            if text is not None:
+                return [text]
+        if type(self).get_geojson_feature_list is not LeafletAdminListMixin.get_geojson_feature_list:
+            # the overriden method is responsible for the whole feature list
+            feature_list = self.get_geojson_feature_list(request, queryset)
+        else:
+            feature_list = {
+                'type': 'FeatureCollection',
+                'features': self.get_geojson_feature_iterator(request, queryset),
+            }
+        feature_list.update(members)
+        if self.geojson_format == 'compact':
+            feature_list = CompactEncoder(6 if self.geojson_precision is None else self.geojson_precision).encode_feature_list(feature_list)
+        if key is None:
+            return timing.encode(request, iterencode(feature_list))
+        text = ''.join(timing.encode(request, iterencode(feature_list)))
+        caches[self.geojson_cache].set(key, text, self.geojson_cache_timeout)
+        return [text]
+
+    def get_geojson_cluster_list(self, request, queryset, zoom):
+        '''returns the GeoJSON `FeatureList` instance representing clusters of objects from a `queryset` for the map `zoom` level'''
+        size = grid_size(self.geojson_cluster_size, zoom)
+        return {
+            'type': 'FeatureCollection',
+            'features': [
+                self.get_geojson_cluster(request, name, cluster, queryset)
+                for name in self.get_geojson_geometry_fields(request, None, queryset)
+                for cluster in self.get_geojson_clusters(request, name, queryset, size)
+            ],
+            'clustered': True,
+        }
+
+    def get_geojson_clusters(self, request, name, queryset, size):
+        '''returns a list of `(count, x, y, xmin, ymin, xmax, ymax)` clusters of the geometry field `name` for objects from a `queryset`
+        collected into grid cells of the `size` degrees, geometries stored in another coordinate system are transformed to WGS 84'''
+        queryset = queryset.filter(**{'%s__isnull' % name: False})
+        connection = connections[queryset.db]
+        if not getattr(connection.ops, 'postgis', False):
+            points = []
+            for geometry, in queryset.values_list(name).iterator():
+                if geometry.srid != 4326:
+                    # the grid is measured in degrees, and clusters are shown on the map in degrees also
+                    geometry = geometry.transform(4326, clone=True)
+                centroid = geometry.centroid
+                points.append((centroid.x, centroid.y) + geometry.extent)
+            return grid_clusters(points, size)
+
+        qn = connection.ops.quote_name
+        opts = queryset.model._meta
+        field = opts.get_field(name)
+        geometry = 't.%s::geometry' % qn(field.column)
+        if field.srid != 4326:
+            # the grid is measured in degrees, and clusters are shown on the map in degrees also
+            geometry = 'ST_Transform(%s, 4326)' % geometry
+        pks, params = queryset.values('pk').query.sql_with_params()
+        sql = (
+            'SELECT count(*), avg(ST_X(c)), avg(ST_Y(c)), min(ST_XMin(g)), min(ST_YMin(g)), max(ST_XMax(g)), max(ST_YMax(g)) FROM ('
+            'SELECT %(geometry)s AS g, ST_Centroid(%(geometry)s) AS c '
+            'FROM %(table)s t WHERE t.%(pk)s IN (%(pks)s)'
+            ') q GROUP BY ST_SnapToGrid(c, %%s)'
+        ) % {
+            'geometry': geometry,
+            'pk': qn(opts.pk.column),
+            'table': qn(opts.db_table),
+            'pks': pks,
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(sql, list(params) + [size])
+            return cursor.fetchall()
+
+    def get_geojson_cluster(self, request, name, cluster, queryset):
+        '''returns a GeoJSON `Feature` instance representing the `cluster` of the geometry field `name`'''
+        count, x, y, xmin, ymin, xmax, ymax = cluster
+        return {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [x, y]},
+            'properties': {
+                'field': name,
+                'cluster': True,
+                'count': count,
+                'bbox': [xmin, ymin, xmax, ymax],
+                'tooltip': '%s %s' % (count, self.model._meta.verbose_name_plural if count > 1 else self.model._meta.verbose_name),
+            },
         }
 
     def get_geojson_features(self, request, o, queryset):
@@ -71,16 +1022,33 @@ class LeafletAdminListMixin(object):
             for name in self.get_geojson_geometry_fields(request, o, queryset)
         ] if feature]
 
-    def get_geojson_geometry_fields(self, request, o, queryset):
-        '''returns a list of geometry field names need to be included into the feature list'''
+    def get_geojson_context(self, request, queryset):
+        '''returns the `FeatureContext` instance keeping data resolved once per request and used to produce every feature'''
+        contexts = getattr(request, '_leaflet_admin_list_contexts', None)
+        if contexts is None:
+            contexts = {}
+            if request is not None:
+                request._leaflet_admin_list_contexts = contexts
+        context = contexts.get(id(self))
+        if context is None:
+            context = contexts[id(self)] = self.create_geojson_context(request, queryset)
+        return context
+
+    def create_geojson_context(self, request, queryset):
+        '''creates the `FeatureContext` instance for the `request`'''
         geometry_fields = getattr(self, 'geometry_fields', [])
         if not geometry_fields:
             geometry_fields = [f.name for f in self.model._meta.get_fields() if isinstance(f, GeometryField)]
-        return geometry_fields
+        return FeatureContext(self, geometry_fields)
+
+    def get_geojson_geometry_fields(self, request, o, queryset):
+        '''returns a list of geometry field names need to be included into the feature list'''
+        return self.get_geojson_context(request, queryset).geometry_fields
 
     def get_geojson_feature(self, request, name, o, queryset):
         '''returns a GeoJSON `Feature` instance representing the instance `o` geometry field `name`'''
-        if not getattr(o, name):
+        annotation = GEOJSON_ANNOTATION % name
+        if not getattr(o, annotation if hasattr(o, annotation) else name):
             return
         return {
             'type': 'Feature',
@@ -90,14 +1058,25 @@ class LeafletAdminListMixin(object):
 
     def get_geojson_geometry(self, request, name, o, queryset):
         '''returns a `geometry` member of the GeoJSON `Feature` instance representing the instance `o` geometry field `name`'''
-        return json.loads(getattr(o, name).geojson)
+        annotation = GEOJSON_ANNOTATION % name
+        if hasattr(o, annotation):
+            return RawJSON(getattr(o, annotation))
+        geometry = getattr(o, name)
+        tolerance = self.get_geojson_simplify_tolerance(request, queryset)
+        if tolerance:
+            tolerance = field_size(tolerance, self.model._meta.get_field(name), connections[o._state.db])
+            geometry = geometry.simplify(tolerance, preserve_topology=True)
+        if self.geojson_precision is None:
+            return json.loads(geometry.geojson)
+        return round_coordinates(json.loads(geometry.geojson), self.geojson_precision)
 
     def get_geojson_properties(self, request, name, o, queryset):
         '''returns a `properties` member of the GeoJSON `Feature` instance representing the instance `o` geometry field `name`'''
+        context = self.get_geojson_context(request, queryset)
         r = {
             'field': name,
-            'app_label': o._meta.app_label,
-            'model_name': o._meta.model_name,
+            'app_label': context.app_label,
+            'model_name': context.model_name,
             'pk': o.pk if isinstance(o.pk, (int, str)) else str(o.pk),
         }
         popup = self.get_geojson_feature_popup(request, name, o, queryset)
@@ -117,10 +1096,11 @@ class LeafletAdminListMixin(object):
 
     def get_geojson_feature_verbose_name(self, request, name, o, queryset):
         '''returns a verbose name of the instance `o` geometry field `name` which is used to create popup and tooltip'''
-        return str(self.model._meta.get_field(name).verbose_name)
+        return self.get_geojson_context(request, queryset).get_verbose_name(name)
 
     def get_geojson_feature_popup(self, request, name, o, queryset):
         '''returns a `popup` property of the GeoJSON `Feature` instance representing the instance `o` geometry field `name`'''
+        context = self.get_geojson_context(request, queryset)
         return (
             '<div>'
             '<a title="%(view_edit)s" href="%(link)s">'
@@ -128,14 +1108,9 @@ class LeafletAdminListMixin(object):
             '</a>'
             '</div>'
         ) % {
-            'view_edit': _('View/Edit %(model_verbose_name)s') % {
-                'model_verbose_name': self.model._meta.verbose_name,
-            },
+            'view_edit': context.view_edit,
             'instance': '%s' % o,
-            'link': reverse('admin:%s_%s_change' % (
-                self.model._meta.app_label,
-                self.model._meta.model_name,
-            ), args=[o.pk]),
+            'link': context.get_change_url(o.pk),
         }
 
     def get_geojson_feature_tooltip(self, request, name, o, queryset):
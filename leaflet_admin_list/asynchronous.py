@@ -0,0 +1,34 @@
+import asyncio
+
+
+async def merge(*iterators):
+    '''yields items of asynchronous `iterators` in the order they are produced, consuming all `iterators` concurrently'''
+    # the bounded queue keeps iterators from running far ahead of the consumer
+    queue = asyncio.Queue(maxsize=len(iterators))
+    done = object()
+
+    async def consume(iterator):
+        try:
+            async for item in iterator:
+                await queue.put((None, item))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put((e, done))
+        else:
+            await queue.put((None, done))
+
+    tasks = [asyncio.ensure_future(consume(iterator)) for iterator in iterators]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            error, item = await queue.get()
+            if error is not None:
+                raise error
+            if item is done:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
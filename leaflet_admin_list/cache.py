@@ -0,0 +1,102 @@
+import collections
+import hashlib
+import uuid
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import post_delete, post_save
+
+
+#: hit and miss counters of the feature list cache of the current process
+stats = collections.Counter()
+
+#: cache aliases keeping versions of registered models, by the model label
+_registry = {}
+
+#: size accounting of named bounded local memory caches
+_usages = {}
+
+
+def make_key(*parts):
+    '''returns the cache key made of `parts`, hashing them to keep the key short and safe'''
+    return 'leaflet_admin_list:%s' % hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _version_key(model):
+    return 'leaflet_admin_list:version:%s' % model._meta.concrete_model._meta.label_lower
+
+
+def get_version(model, alias):
+    '''returns the current version of the cached data of the `model` in the cache `alias`'''
+    cache = caches[alias]
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(model):
+    '''invalidates the cached data of the `model`, should be called after bulk updates not sending signals'''
+    for alias in _registry.get(model._meta.concrete_model._meta.label_lower, ()):
+        # the random version can't repeat even if the previous one has been evicted from the cache
+        caches[alias].set(_version_key(model), uuid.uuid4().hex, None)
+
+
+def _invalidate_receiver(sender, **kwargs):
+    invalidate(sender)
+
+
+def register(model, alias):
+    '''registers the `model` to invalidate its cached data in the cache `alias` when an instance is saved or deleted'''
+    _registry.setdefault(model._meta.concrete_model._meta.label_lower, set()).add(alias)
+    for signal in (post_save, post_delete):
+        signal.connect(_invalidate_receiver, sender=model, dispatch_uid='leaflet_admin_list:%s' % model._meta.label_lower)
+
+
+class _Usage(object):
+    def __init__(self):
+        self.sizes = {}
+        self.total = 0
+
+
+class BoundedLocMemCache(LocMemCache):
+    '''The local memory cache bounded by the total size of pickled values (the `MAX_SIZE` option, 64 MB by default)
+    besides the number of entries, for single-process deployments'''
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._max_size = int(params.get('OPTIONS', {}).get('MAX_SIZE', 64 * 1024 * 1024))
+        self._usage = _usages.setdefault(name, _Usage())
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        self._delete(key)
+        if len(value) > self._max_size:
+            return
+        while self._cache and self._usage.total + len(value) > self._max_size:
+            # the least recently used entry is the last one
+            self._delete(next(reversed(self._cache)))
+        super()._set(key, value, timeout)
+        self._usage.sizes[key] = len(value)
+        self._usage.total += len(value)
+
+    def _cull(self):
+        if self._cull_frequency == 0:
+            keys = list(self._cache)
+        else:
+            keys = list(reversed(self._cache))[:len(self._cache) // self._cull_frequency]
+        for key in keys:
+            self._delete(key)
+
+    def _delete(self, key):
+        self._usage.total -= self._usage.sizes.pop(key, 0)
+        return super()._delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._expire_info.clear()
+            self._usage.sizes.clear()
+            self._usage.total = 0
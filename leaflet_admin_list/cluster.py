@@ -0,0 +1,80 @@
+import math
+
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+#: length of the degree of the equator in meters
+DEGREE_METERS = 6378137 * math.pi / 180
+
+
+def grid_size(pixels, zoom):
+    '''returns the size of the grid cell in degrees, which is `pixels` wide on the map with the `zoom` level'''
+    return pixels * 360.0 / (256 * 2 ** zoom)
+
+
+def field_size(size, field, connection):
+    '''returns the `size` in degrees converted to units of the coordinate system of the geometry `field`,
+    the length of the degree of the equator is used for projected coordinate systems'''
+    if field.geodetic(connection):
+        return size
+    return size * DEGREE_METERS / field.units(connection)[0]
+
+
+def grid_clusters(points, size):
+    '''returns a list of clusters of `points` collected into grid cells of the `size` degrees
+
+    The `points` is a list of `(x, y, xmin, ymin, xmax, ymax)` tuples, where `x` and `y` are coordinates of the point
+    representing the geometry, and others are the geometry bounds.
+
+    Every cluster is a `(count, x, y, xmin, ymin, xmax, ymax)` tuple, where `x` and `y` are the mean of
+    representing points, and others are the cluster bounds.
+    '''
+    if not points:
+        return []
+    if numpy is not None:
+        return _grid_clusters_numpy(points, size)
+    return _grid_clusters_python(points, size)
+
+
+def _grid_clusters_numpy(points, size):
+    a = numpy.asarray(points, dtype=float)
+    cells = numpy.floor(a[:, :2] / size).astype(numpy.int64)
+    cells, index = numpy.unique(cells, axis=0, return_inverse=True)
+    index = index.reshape(-1)
+    n = len(cells)
+    count = numpy.bincount(index, minlength=n)
+    x = numpy.bincount(index, weights=a[:, 0], minlength=n) / count
+    y = numpy.bincount(index, weights=a[:, 1], minlength=n) / count
+    lower = numpy.full((n, 2), numpy.inf)
+    upper = numpy.full((n, 2), -numpy.inf)
+    numpy.minimum.at(lower, index, a[:, 2:4])
+    numpy.maximum.at(upper, index, a[:, 4:6])
+    return [
+        (int(count[i]), float(x[i]), float(y[i]), float(lower[i, 0]), float(lower[i, 1]), float(upper[i, 0]), float(upper[i, 1]))
+        for i in range(n)
+    ]
+
+
+def _grid_clusters_python(points, size):
+    cells = {}
+    for x, y, xmin, ymin, xmax, ymax in points:
+        key = (math.floor(x / size), math.floor(y / size))
+        c = cells.get(key)
+        if c is None:
+            cells[key] = [1, x, y, xmin, ymin, xmax, ymax]
+            continue
+        c[0] += 1
+        c[1] += x
+        c[2] += y
+        c[3] = min(c[3], xmin)
+        c[4] = min(c[4], ymin)
+        c[5] = max(c[5], xmax)
+        c[6] = max(c[6], ymax)
+    return [
+        (count, x / count, y / count, xmin, ymin, xmax, ymax)
+        for count, x, y, xmin, ymin, xmax, ymax in cells.values()
+    ]
@@ -0,0 +1,135 @@
+import json
+
+from .encoder import RawJSON
+
+
+#: geometry type codes of the compact format
+GEOMETRY_TYPES = {
+    'Point': 1,
+    'LineString': 2,
+    'Polygon': 3,
+    'MultiPoint': 4,
+    'MultiLineString': 5,
+    'MultiPolygon': 6,
+    'GeometryCollection': 7,
+}
+GEOMETRY_NAMES = {code: name for name, code in GEOMETRY_TYPES.items()}
+
+#: nesting depth of coordinate lists by the geometry type
+DEPTHS = {
+    'Point': 0,
+    'LineString': 1,
+    'MultiPoint': 1,
+    'Polygon': 2,
+    'MultiLineString': 2,
+    'MultiPolygon': 3,
+}
+
+
+class CompactEncoder(object):
+    '''Encodes GeoJSON `Feature` instances into the compact format
+
+    Every feature is encoded as a `[tags, geometry]` pair. The `tags` is a list of `key, value` index pairs
+    referencing the `keys` and `values` tables of the feature list. The `geometry` is a flat list of integers:
+    the geometry type code, followed by lengths of nested coordinate lists and coordinates multiplied by `10 ** precision`,
+    every coordinate encoded as a difference from the previous one in the whole feature list.
+    '''
+
+    def __init__(self, precision):
+        self.precision = precision
+        self.scale = 10 ** precision
+        self.keys = {}
+        self.values = {}
+        self.x = 0
+        self.y = 0
+
+    def encode_feature_list(self, feature_list):
+        '''returns the compact `FeatureList` replacing the GeoJSON one, encoding its features lazily'''
+        r = {
+            'type': 'CompactFeatureCollection',
+            'precision': self.precision,
+            'features': self.encode_features(feature_list['features']),
+            # tables are filled in when all features have been encoded
+            'keys': self.iter_table(self.keys),
+            'values': (RawJSON(v) for v in self.iter_table(self.values)),
+        }
+        r.update((k, v) for k, v in feature_list.items() if k not in ('type', 'features'))
+        return r
+
+    def iter_table(self, table):
+        '''yields members of the `table`, starting to iterate over the table when the first member is requested'''
+        yield from table
+
+    def encode_features(self, features):
+        for feature in features:
+            if isinstance(feature, RawJSON):
+                feature = json.loads(feature.text)
+            yield self.encode_feature(feature)
+
+    def encode_feature(self, feature):
+        '''returns the `[tags, geometry]` pair representing the GeoJSON `feature`'''
+        tags = []
+        for k, v in feature['properties'].items():
+            tags.append(self.keys.setdefault(k, len(self.keys)))
+            tags.append(self.values.setdefault(json.dumps(v, sort_keys=True), len(self.values)))
+        geometry = feature['geometry']
+        if isinstance(geometry, RawJSON):
+            geometry = json.loads(geometry.text)
+        r = []
+        self.encode_geometry(geometry, r)
+        return [tags, r]
+
+    def encode_geometry(self, geometry, r):
+        geometry_type = geometry['type']
+        r.append(GEOMETRY_TYPES[geometry_type])
+        if geometry_type == 'GeometryCollection':
+            r.append(len(geometry['geometries']))
+            for g in geometry['geometries']:
+                self.encode_geometry(g, r)
+        else:
+            self.encode_coordinates(geometry['coordinates'], DEPTHS[geometry_type], r)
+
+    def encode_coordinates(self, coordinates, depth, r):
+        if depth:
+            r.append(len(coordinates))
+            for c in coordinates:
+                self.encode_coordinates(c, depth - 1, r)
+            return
+        x = int(round(coordinates[0] * self.scale))
+        y = int(round(coordinates[1] * self.scale))
+        r.append(x - self.x)
+        r.append(y - self.y)
+        self.x, self.y = x, y
+
+
+def decode_feature_list(feature_list):
+    '''returns the GeoJSON `FeatureList` decoded from the compact one, the same as the map does'''
+    scale = 10 ** feature_list['precision']
+    keys = feature_list['keys']
+    values = feature_list['values']
+    cursor = [0, 0]
+
+    def coordinates(g, depth):
+        if depth:
+            return [coordinates(g, depth - 1) for n in range(next(g))]
+        cursor[0] += next(g)
+        cursor[1] += next(g)
+        return [cursor[0] / scale, cursor[1] / scale]
+
+    def geometry(g):
+        geometry_type = GEOMETRY_NAMES[next(g)]
+        if geometry_type == 'GeometryCollection':
+            return {'type': geometry_type, 'geometries': [geometry(g) for n in range(next(g))]}
+        return {'type': geometry_type, 'coordinates': coordinates(g, DEPTHS[geometry_type])}
+
+    r = {k: v for k, v in feature_list.items() if k not in ('type', 'precision', 'keys', 'values', 'features')}
+    r['type'] = 'FeatureCollection'
+    r['features'] = [
+        {
+            'type': 'Feature',
+            'geometry': geometry(iter(g)),
+            'properties': {keys[tags[i]]: values[tags[i + 1]] for i in range(0, len(tags), 2)},
+        }
+        for tags, g in feature_list['features']
+    ]
+    return r
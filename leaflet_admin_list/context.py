@@ -0,0 +1,40 @@
+from urllib.parse import quote
+
+from django.urls import reverse
+from django.utils.http import RFC3986_SUBDELIMS
+from django.utils.translation import gettext_lazy as _
+
+
+#: placeholder of the primary key in the URL template
+PK_PLACEHOLDER = '__pk__'
+
+
+class FeatureContext(object):
+    '''Data resolved once per request and used to produce every feature of the feature list'''
+
+    def __init__(self, model_admin, geometry_fields):
+        self.opts = opts = model_admin.model._meta
+        self.app_label = opts.app_label
+        self.model_name = opts.model_name
+        self.geometry_fields = geometry_fields
+        self.verbose_names = {}
+        #: the zoom level of the map if known
+        self.zoom = None
+        self.view_edit = str(_('View/Edit %(model_verbose_name)s') % {
+            'model_verbose_name': opts.verbose_name,
+        })
+        self.change_url_template = reverse('admin:%s_%s_change' % (
+            opts.app_label,
+            opts.model_name,
+        ), args=[PK_PLACEHOLDER])
+
+    def get_verbose_name(self, name):
+        '''returns the verbose name of the field `name`'''
+        verbose_name = self.verbose_names.get(name)
+        if verbose_name is None:
+            verbose_name = self.verbose_names[name] = str(self.opts.get_field(name).verbose_name)
+        return verbose_name
+
+    def get_change_url(self, pk):
+        '''returns the URL of the change view for the primary key `pk`, the same as `reverse` does'''
+        return self.change_url_template.replace(PK_PLACEHOLDER, quote(str(pk), safe=RFC3986_SUBDELIMS + '/~:@'))
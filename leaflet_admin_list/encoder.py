@@ -0,0 +1,130 @@
+import json
+import re
+import uuid
+from collections.abc import Iterator
+
+
+class RawJSON(object):
+    '''A piece of already encoded JSON text which is spliced into the output as is'''
+
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return 'RawJSON(%r)' % self.text
+
+
+#: the random token marking places of `RawJSON` members in the encoded text, and the pattern of the marked place
+_RAW_TOKEN = uuid.uuid4().hex
+_RAW_PATTERN = re.compile('"%s:(\\d+)"' % _RAW_TOKEN)
+
+
+def dumps(o):
+    '''returns JSON text representing `o`, where every `RawJSON` member is spliced into the text without re-encoding'''
+    if isinstance(o, RawJSON):
+        return o.text
+    raw = []
+
+    def default(value):
+        if isinstance(value, RawJSON):
+            raw.append(value.text)
+            return '%s:%s' % (_RAW_TOKEN, len(raw) - 1)
+        raise TypeError('Object of type %s is not JSON serializable' % type(value).__name__)
+
+    text = json.dumps(o, default=default)
+    if not raw:
+        return text
+    return _RAW_PATTERN.sub(lambda m: raw[int(m.group(1))], text)
+
+
+def iterencode(o, chunk_size=65536):
+    '''yields chunks of JSON text representing `o`, where every iterator member of `o` (or of its `dict` members)
+    is consumed lazily and encoded as an array, one item at a time'''
+    chunk = []
+    size = 0
+    for piece in _iterencode(o):
+        chunk.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _iterencode(o):
+    if isinstance(o, dict):
+        yield '{'
+        for i, (key, value) in enumerate(o.items()):
+            yield '%s%s: ' % (', ' if i else '', json.dumps(str(key)))
+            yield from _iterencode(value)
+        yield '}'
+    elif isinstance(o, Iterator):
+        yield '['
+        for i, item in enumerate(o):
+            if i:
+                yield ', '
+            yield item.text if isinstance(item, RawJSON) else dumps(item)
+        yield ']'
+    else:
+        yield dumps(o)
+
+
+async def aiterencode(o, chunk_size=65536):
+    '''the same as `iterencode` for asynchronous iterator members of `o` (or of its `dict` members),
+    yields chunks of JSON text asynchronously'''
+    chunk = []
+    size = 0
+    async for piece in _aiterencode(o):
+        chunk.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield ''.join(chunk)
+
+
+async def _aiterencode(o):
+    if isinstance(o, dict):
+        yield '{'
+        for i, (key, value) in enumerate(o.items()):
+            yield '%s%s: ' % (', ' if i else '', json.dumps(str(key)))
+            async for piece in _aiterencode(value):
+                yield piece
+        yield '}'
+    elif hasattr(o, '__aiter__'):
+        yield '['
+        i = 0
+        async for item in o:
+            if i:
+                yield ', '
+            i += 1
+            yield item.text if isinstance(item, RawJSON) else dumps(item)
+        yield ']'
+    else:
+        yield dumps(o)
+
+
+#: characters escaped to include JSON text into the `<script>` element safely
+_SCRIPT_ESCAPES = {ord('<'): '\\u003C', ord('>'): '\\u003E', ord('&'): '\\u0026'}
+
+
+def script_escape(text):
+    '''returns JSON `text` escaped to be included into the `<script>` element'''
+    return text.translate(_SCRIPT_ESCAPES)
+
+
+def script_dumps(o):
+    '''returns JSON text representing `o` which may be included into the `<script>` element'''
+    return script_escape(dumps(o))
@@ -0,0 +1,56 @@
+from django.contrib.gis.db.models import Extent, GeometryField
+from django.db import DatabaseError, connections, transaction
+from django.db.models.functions import Cast
+
+
+def union(*extents):
+    '''returns the `(xmin, ymin, xmax, ymax)` extent covering all `extents`, skipping None ones, or None if all are None'''
+    extents = [e for e in extents if e is not None]
+    if not extents:
+        return None
+    return (
+        min(e[0] for e in extents),
+        min(e[1] for e in extents),
+        max(e[2] for e in extents),
+        max(e[3] for e in extents),
+    )
+
+
+def get_extent(queryset, names):
+    '''returns the `(xmin, ymin, xmax, ymax)` extent of geometry fields `names` of all objects of a `queryset`
+    computed by the database aggregate in one query, or None if there are no geometries'''
+    aggregates = {}
+    for name in names:
+        field = queryset.model._meta.get_field(name)
+        expression = name
+        if getattr(field, 'geography', False):
+            expression = Cast(name, GeometryField(srid=field.srid))
+        aggregates['extent_%s' % name] = Extent(expression)
+    if not aggregates:
+        return None
+    return union(*queryset.aggregate(**aggregates).values())
+
+
+def get_estimated_extent(model, names, using):
+    '''returns the `(xmin, ymin, xmax, ymax)` extent of geometry fields `names` of the whole `model` table estimated
+    by the PostGIS table statistics (`ST_EstimatedExtent`), or None if statistics are not available'''
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    table = model._meta.db_table
+    extents = []
+    try:
+        # the failure should not break the current transaction
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            for name in names:
+                cursor.execute(
+                    'SELECT ST_XMin(e), ST_YMin(e), ST_XMax(e), ST_YMax(e) FROM (SELECT ST_EstimatedExtent(%s, %s) AS e) AS s',
+                    [table, model._meta.get_field(name).column],
+                )
+                row = cursor.fetchone()
+                if row is None or row[0] is None:
+                    return None
+                extents.append(row)
+    except DatabaseError:
+        return None
+    return union(*extents)
@@ -1,24 +1,66 @@
 import functools
+import math
 import operator
 
 from django.contrib import admin
-from django.contrib.gis.db.models import GeometryField
-from django.contrib.gis.geos import Polygon
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.gis.db.models import GeometryField, PointField
+from django.contrib.gis.geos import Point, Polygon
+from django.contrib.gis.measure import D
+from django.db import connections
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
+from . import polyline
+
+
+#: mean radius of the Earth in meters
+EARTH_RADIUS = 6371008.8
+
 
 class BoundingBoxFilter(admin.SimpleListFilter):
     title = _('Bounding Box')
     parameter_name = 'bounding_box'
     template = 'leaflet_admin_list/leaflet_admin_filter.html'
+    #: class of the filter element recognized by the map
+    html_class = 'bounding_box_filter'
+    #: use the index-friendly bounding box overlap lookup, checking the exact intersection only where necessary (PostGIS only)
+    fast = False
+    #: filter every geometry field by a separate index scan uniting primary keys instead of the OR condition (fast mode only)
+    union = False
 
     def queryset(self, request, queryset):
         if not self.value():
             return queryset
         polygon = self.get_bbox(self.value())
+        if polygon is None:
+            raise IncorrectLookupParameters('Malformed %s filter value' % self.parameter_name)
+        return self.filter_bbox(request, queryset, polygon)
+
+    def filter_bbox(self, request, queryset, polygon):
+        '''returns a `queryset` filtered by the `polygon`'''
         fields = self.get_geometry_fields(request, queryset)
-        return queryset.filter(functools.reduce(operator.or_, [Q(**{'%s__intersects' % name: polygon}) for name in fields]))
+        if not self.fast or not getattr(connections[queryset.db].ops, 'postgis', False):
+            return queryset.filter(functools.reduce(operator.or_, [self.get_condition(request, queryset.model, name, polygon) for name in fields]))
+        conditions = [self.get_bbox_condition(request, queryset.model, name, polygon) for name in fields]
+        if not self.union or len(conditions) < 2:
+            return queryset.filter(functools.reduce(operator.or_, conditions))
+        manager = queryset.model._base_manager.db_manager(queryset.db)
+        pks = [manager.filter(c).order_by().values('pk') for c in conditions]
+        return queryset.filter(pk__in=pks[0].union(*pks[1:]))
+
+    def get_condition(self, request, model, name, polygon):
+        '''returns the condition selecting objects whose geometry field `name` intersects the `polygon`'''
+        return Q(**{'%s__intersects' % name: polygon})
+
+    def get_bbox_condition(self, request, model, name, polygon):
+        '''returns the index-friendly condition selecting objects whose geometry field `name` intersects the `polygon`'''
+        condition = Q(**{'%s__bboverlaps' % name: polygon})
+        field = model._meta.get_field(name)
+        if isinstance(field, PointField) and not field.geography:
+            # the bounding box of the point is the point itself, so the overlap is exact
+            return condition
+        return condition & Q(**{'%s__intersects' % name: polygon})
 
     def has_output(self):
         return True
@@ -50,4 +92,91 @@ class BoundingBoxFilter(admin.SimpleListFilter):
             p0, [p0[0], p1[1]],
             p1, [p1[0], p0[1]],
             p0
-        ])
+        ], srid=4326)
+
+
+class PolygonFilter(BoundingBoxFilter):
+    '''Selects objects intersecting the polygon drawn on the map, passed as the encoded polyline (see `leaflet_admin_list.polyline`)
+    of its simplified outline
+
+    PostGIS prepares the polygon once for the query, so the exact intersection check of every candidate
+    found by the bounding box overlap is cheap.
+    '''
+    title = _('Polygon')
+    parameter_name = 'polygon'
+    html_class = 'polygon_filter'
+    fast = True
+
+    def lookups(self, request, model_admin):
+        return (
+            (self.bbox_selected(), _('Drawn polygon')),
+        )
+
+    def get_bbox_condition(self, request, model, name, polygon):
+        # the overlap of bounding boxes is not exact for points if the polygon is not a rectangle
+        return Q(**{'%s__bboverlaps' % name: polygon}) & Q(**{'%s__intersects' % name: polygon})
+
+    def get_bbox(self, value):
+        try:
+            ring = polyline.decode(value)
+        except ValueError:
+            return None
+        if ring and ring[0] != ring[-1]:
+            ring.append(ring[0])
+        if len(ring) < 4:
+            return None
+        polygon = Polygon(ring, srid=4326)
+        if not polygon.valid:
+            # self-intersecting outlines drawn by hand are repaired, `make_valid` is available since Django 4.1
+            polygon = polygon.make_valid() if hasattr(polygon, 'make_valid') else polygon.buffer(0)
+        return polygon if not polygon.empty else None
+
+
+class DistanceFilter(BoundingBoxFilter):
+    '''Selects objects within the distance from the map center, passed as `lon,lat,meters`'''
+    title = _('Distance')
+    parameter_name = 'distance'
+    html_class = 'distance_filter'
+    fast = True
+    #: distances in meters offered by the filter
+    distances = (1000, 5000, 10000, 50000)
+
+    def lookups(self, request, model_admin):
+        area = self.get_bbox(self.value() or '')
+        r = []
+        for distance in self.distances:
+            # the map replaces the center when the choice is followed
+            value = self.value() if area and area[1] == distance else '0,0,%s' % distance
+            r.append((value, _('Within %(distance)s km of the map center') % {'distance': '%g' % (distance / 1000)}))
+        return r
+
+    def get_condition(self, request, model, name, area):
+        return Q(**{'%s__distance_lte' % name: (area[0], D(m=area[1]))})
+
+    def get_bbox_condition(self, request, model, name, area):
+        '''returns the index-friendly condition selecting objects whose geometry field `name` is within the `area`
+        distance from its center'''
+        center, distance = area
+        if model._meta.get_field(name).geography:
+            return Q(**{'%s__dwithin' % name: (center, D(m=distance))})
+        return Q(**{'%s__bboverlaps' % name: self.get_area_bbox(area)}) & self.get_condition(request, model, name, area)
+
+    def get_area_bbox(self, area):
+        '''returns the rectangle containing the `area`, with some margin for the difference of the sphere and the spheroid'''
+        center, distance = area
+        dlat = math.degrees(distance * 1.01 / EARTH_RADIUS)
+        cos = math.cos(math.radians(min(abs(center.y) + dlat, 90)))
+        dlon = 180 if cos < 1e-6 else min(dlat / cos, 180)
+        return super().get_bbox('%s,%s,%s,%s' % (
+            max(center.x - dlon, -180), max(center.y - dlat, -90), min(center.x + dlon, 180), min(center.y + dlat, 90),
+        ))
+
+    def get_bbox(self, value):
+        '''returns the `(center, meters)` pair of the `value`'''
+        try:
+            lon, lat, distance = [float(c) for c in value.split(',')]
+        except Exception:
+            return None
+        if not (-180 <= lon <= 180 and -90 <= lat <= 90 and distance > 0):
+            return None
+        return Point(lon, lat, srid=4326), distance
@@ -0,0 +1,11 @@
+from django.contrib.gis.db.models.functions import (
+    NUMERIC_TYPES,
+    GeomOutputGeoFunc,
+)
+
+
+class SimplifyPreserveTopology(GeomOutputGeoFunc):
+    '''Simplifies the geometry with the `tolerance` preserving its topology'''
+
+    def __init__(self, expression, tolerance, **extra):
+        super().__init__(expression, self._handle_param(tolerance, 'tolerance', NUMERIC_TYPES), **extra)
@@ -0,0 +1,38 @@
+import os
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from leaflet_admin_list import vendor
+
+
+class Command(BaseCommand):
+    help = 'Downloads map plugins to serve them as static files bundled together, see the LEAFLET_ADMIN_LIST_VENDOR setting'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Static files directory, the first of STATICFILES_DIRS by default')
+
+    def handle(self, *args, **options):
+        output = options['output'] or next(iter(getattr(settings, 'STATICFILES_DIRS', [])), None)
+        if not output:
+            raise CommandError('The output directory is not given and STATICFILES_DIRS is empty')
+        if isinstance(output, (list, tuple)):
+            raise CommandError('The first of STATICFILES_DIRS has a prefix, give the output directory explicitly')
+        directory = os.path.join(output, *vendor.VENDOR_DIR.split('/'))
+        os.makedirs(directory, exist_ok=True)
+        self.bundle(os.path.join(directory, 'plugins.css'), vendor.CSS)
+        self.bundle(os.path.join(directory, 'plugins.js'), vendor.JS)
+        for name, url in vendor.OPTIONAL.items():
+            self.bundle(os.path.join(directory, name), [url])
+
+    def bundle(self, path, urls):
+        '''writes contents of `urls` one after another to the file `path`'''
+        with open(path, 'wb') as f:
+            for url in urls:
+                with urlopen(url) as response:
+                    f.write(('/* %s */\n' % url).encode('utf-8'))
+                    f.write(response.read())
+                    # the script may miss the final semicolon and the new line
+                    f.write(b';\n' if path.endswith('.js') else b'\n')
+        self.stdout.write('%s: %s' % (path, ', '.join(urls)))
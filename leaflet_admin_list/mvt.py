@@ -0,0 +1,232 @@
+import math
+import struct
+
+from django.contrib.gis.geos import (
+    GeometryCollection,
+    LinearRing,
+    LineString,
+    MultiLineString,
+    MultiPoint,
+    MultiPolygon,
+    Point,
+    Polygon,
+)
+
+
+#: the extent of the tile in the tile coordinate system
+EXTENT = 4096
+#: the buffer around the tile in the tile coordinate system
+BUFFER = 64
+
+#: half of the Web Mercator (EPSG:3857) world size
+MERCATOR_HALF = 20037508.342789244
+
+POINT = 1
+LINESTRING = 2
+POLYGON = 3
+
+MOVE_TO = 1
+LINE_TO = 2
+CLOSE_PATH = 7
+
+
+def tile_bounds(z, x, y, buffer=0):
+    '''returns the `(xmin, ymin, xmax, ymax)` bounds of the tile in the Web Mercator (EPSG:3857) coordinates'''
+    size = 2 * MERCATOR_HALF / (1 << z)
+    margin = size * buffer / EXTENT
+    xmin = -MERCATOR_HALF + x * size
+    ymax = MERCATOR_HALF - y * size
+    return (xmin - margin, ymax - size - margin, xmin + size + margin, ymax + margin)
+
+
+def tile_lonlat_bounds(z, x, y, buffer=0):
+    '''returns the `(west, south, east, north)` bounds of the tile in the WGS84 (EPSG:4326) coordinates'''
+    xmin, ymin, xmax, ymax = tile_bounds(z, x, y, buffer)
+
+    def lon(x):
+        return max(-180.0, min(180.0, x / MERCATOR_HALF * 180.0))
+
+    def lat(y):
+        y = max(-MERCATOR_HALF, min(MERCATOR_HALF, y))
+        return math.degrees(math.atan(math.sinh(y / MERCATOR_HALF * math.pi)))
+
+    return (lon(xmin), lat(ymin), lon(xmax), lat(ymax))
+
+
+def _varint(value):
+    r = bytearray()
+    while True:
+        bits = value & 0x7f
+        value >>= 7
+        if value:
+            r.append(bits | 0x80)
+        else:
+            r.append(bits)
+            return bytes(r)
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field, wire_type):
+    return _varint((field << 3) | wire_type)
+
+
+def _bytes(field, value):
+    return _key(field, 2) + _varint(len(value)) + value
+
+
+def _uint(field, value):
+    return _key(field, 0) + _varint(value)
+
+
+def _packed(field, values):
+    return _bytes(field, b''.join(_varint(v) for v in values))
+
+
+def _value(value):
+    if isinstance(value, bool):
+        return _uint(7, int(value))
+    if isinstance(value, int):
+        if value < 0:
+            return _uint(6, _zigzag(value))
+        return _uint(5, value)
+    if isinstance(value, float):
+        return _key(3, 1) + struct.pack('<d', value)
+    return _bytes(1, str(value).encode('utf-8'))
+
+
+def _command(command, count):
+    return (command & 0x7) | (count << 3)
+
+
+class _Cursor(object):
+    '''keeps the current position to encode points as deltas'''
+
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+
+    def move(self, points):
+        r = []
+        for x, y in points:
+            r.append(_zigzag(x - self.x))
+            r.append(_zigzag(y - self.y))
+            self.x, self.y = x, y
+        return r
+
+    def points(self, points):
+        return [_command(MOVE_TO, len(points))] + self.move(points)
+
+    def line(self, points):
+        r = [_command(MOVE_TO, 1)] + self.move(points[:1])
+        return r + [_command(LINE_TO, len(points) - 1)] + self.move(points[1:])
+
+    def ring(self, points):
+        return self.line(points[:-1]) + [_command(CLOSE_PATH, 1)]
+
+
+def _quantize(coords, transform):
+    r = []
+    for c in coords:
+        p = transform(c[0], c[1])
+        if not r or r[-1] != p:
+            r.append(p)
+    return r
+
+
+def _area(ring):
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:]))
+
+
+def _rings(polygon, transform):
+    r = []
+    for i, ring in enumerate([polygon.exterior_ring] + list(polygon)[1:]):
+        ring = _quantize(ring.coords, transform)
+        if len(ring) < 4:
+            if not i:
+                return []
+            continue
+        # the exterior ring should have positive area and interior rings negative area in the tile coordinate system
+        if (_area(ring) > 0) != (not i):
+            ring = ring[::-1]
+        r.append(ring)
+    return r
+
+
+def _split(geometry):
+    '''splits the geometry to lists of points, lines and polygons'''
+    if isinstance(geometry, Point):
+        return [geometry], [], []
+    if isinstance(geometry, (LineString, LinearRing)):
+        return [], [geometry], []
+    if isinstance(geometry, Polygon):
+        return [], [], [geometry]
+    if isinstance(geometry, (MultiPoint, MultiLineString, MultiPolygon, GeometryCollection)):
+        points, lines, polygons = [], [], []
+        for g in geometry:
+            p, ls, a = _split(g)
+            points += p
+            lines += ls
+            polygons += a
+        return points, lines, polygons
+    return [], [], []
+
+
+def encode_geometry(geometry, transform):
+    '''returns a list of `(type, commands)` tuples representing the geometry transformed by the `transform` function'''
+    points, lines, polygons = _split(geometry)
+    r = []
+    if points:
+        r.append((POINT, _Cursor().points([transform(p.x, p.y) for p in points])))
+    if lines:
+        encoder, commands = _Cursor(), []
+        for line in lines:
+            line = _quantize(line.coords, transform)
+            if len(line) > 1:
+                commands += encoder.line(line)
+        if commands:
+            r.append((LINESTRING, commands))
+    if polygons:
+        encoder, commands = _Cursor(), []
+        for polygon in polygons:
+            for ring in _rings(polygon, transform):
+                commands += encoder.ring(ring)
+        if commands:
+            r.append((POLYGON, commands))
+    return r
+
+
+def encode_layer(name, features, transform, extent=EXTENT):
+    '''returns a Mapbox Vector Tile layer containing `features` given as `(geometry, properties)` tuples,
+    where the geometry is transformed to the tile coordinate system by the `transform` function'''
+    keys, values = {}, {}
+    encoded = []
+    for geometry, properties in features:
+        tags = []
+        for k, v in properties.items():
+            if v is None:
+                continue
+            tags.append(keys.setdefault(k, len(keys)))
+            tags.append(values.setdefault((type(v), v), len(values)))
+        for geometry_type, commands in encode_geometry(geometry, transform):
+            encoded.append(_bytes(2, _packed(2, tags) + _uint(3, geometry_type) + _packed(4, commands)))
+    if not encoded:
+        return b''
+    layer = [_uint(15, 2), _bytes(1, name.encode('utf-8'))] + encoded
+    layer += [_bytes(3, k.encode('utf-8')) for k in keys]
+    layer += [_bytes(4, _value(v)) for t, v in values]
+    layer.append(_uint(5, extent))
+    return _bytes(3, b''.join(layer))
+
+
+def tile_transform(z, x, y, extent=EXTENT):
+    '''returns a function transforming Web Mercator (EPSG:3857) coordinates to the integer tile coordinate system'''
+    xmin, ymin, xmax, ymax = tile_bounds(z, x, y)
+    sx = extent / (xmax - xmin)
+    sy = extent / (ymax - ymin)
+
+    def transform(px, py):
+        return int(round((px - xmin) * sx)), int(round((ymax - py) * sy))
+    return transform
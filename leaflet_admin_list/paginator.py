@@ -0,0 +1,52 @@
+import json
+
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset):
+    '''returns the number of objects of the `queryset` estimated by the query planner,
+    or None if the database can't estimate it (PostgreSQL only)'''
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) %s' % sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedPaginator(Paginator):
+    '''Paginator counting objects exactly up to the `threshold` and estimating the number of objects above it
+
+    The number above the `threshold` is estimated by the query planner, or is reported as the `threshold + 1`
+    (the capped count) if the database can't estimate it. The `estimated` and `capped` attributes tell
+    whether the count is not exact.
+    '''
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, threshold=10000):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.threshold = threshold
+        self.estimated = False
+        self.capped = False
+
+    @cached_property
+    def count(self):
+        # the count of the limited query stops scanning rows at the threshold
+        counted = self.object_list.order_by()[:self.threshold + 1].count()
+        if counted <= self.threshold:
+            return counted
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate > self.threshold:
+            self.estimated = True
+            return estimate
+        self.capped = True
+        return counted
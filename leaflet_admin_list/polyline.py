@@ -0,0 +1,47 @@
+#: number of decimal digits of encoded coordinates, about a meter
+PRECISION = 5
+
+
+def encode(coordinates, precision=PRECISION):
+    '''returns the encoded polyline (the format of the Google Maps API) of `[lon, lat]` `coordinates`'''
+    scale = 10 ** precision
+    r = []
+    previous = [0, 0]
+    for lon, lat in coordinates:
+        # the latitude goes first in the format
+        for i, value in enumerate((int(round(lat * scale)), int(round(lon * scale)))):
+            delta = value - previous[i]
+            previous[i] = value
+            delta = ~(delta << 1) if delta < 0 else delta << 1
+            while delta >= 0x20:
+                r.append(chr((0x20 | (delta & 0x1f)) + 63))
+                delta >>= 5
+            r.append(chr(delta + 63))
+    return ''.join(r)
+
+
+def decode(text, precision=PRECISION):
+    '''returns the list of `[lon, lat]` coordinates of the encoded polyline `text`, raises ValueError if it is malformed'''
+    scale = 10 ** precision
+    values = []
+    value = 0
+    shift = 0
+    for c in text:
+        b = ord(c) - 63
+        if not 0 <= b < 64:
+            raise ValueError('Unexpected character %r of the encoded polyline' % c)
+        value |= (b & 0x1f) << shift
+        shift += 5
+        if b < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = 0
+            shift = 0
+    if shift or len(values) % 2:
+        raise ValueError('The encoded polyline is incomplete')
+    r = []
+    lat = lon = 0
+    for i in range(0, len(values), 2):
+        lat += values[i]
+        lon += values[i + 1]
+        r.append([lon / scale, lat / scale])
+    return r
@@ -0,0 +1,45 @@
+import warnings
+
+from django.db import connections
+
+
+class FeatureQueriesWarning(RuntimeWarning):
+    '''Feature hooks issue database queries for every object of the feature list'''
+
+
+class QueryGuard(object):
+    '''Counts queries issued by feature hooks while features of objects are produced, see `check`'''
+
+    def __init__(self, model_admin, using, enabled=True):
+        self.model_admin = model_admin
+        self.using = using
+        self.enabled = enabled
+        #: number of objects which features have been produced
+        self.objects = 0
+        #: number of queries issued while features have been produced
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def measure(self, func, *args):
+        '''returns the result of the `func` call producing features of the object, counting queries issued by it if enabled'''
+        if not self.enabled:
+            return func(*args)
+        self.objects += 1
+        with connections[self.using].execute_wrapper(self):
+            return func(*args)
+
+    def check(self):
+        '''warns by the `FeatureQueriesWarning` if queries have been issued for every object, so their number grows
+        with the number of objects'''
+        if self.enabled and self.objects > 1 and self.queries >= self.objects:
+            warnings.warn(
+                '%s: %s queries have been issued producing features of %s objects, '
+                'see geojson_select_related and geojson_prefetch_related' % (
+                    self.model_admin.model._meta.label, self.queries, self.objects,
+                ),
+                FeatureQueriesWarning,
+                stacklevel=2,
+            )
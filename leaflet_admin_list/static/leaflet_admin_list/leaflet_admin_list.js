@@ -0,0 +1,657 @@
+// The map of the changelist page, configured by the JSON text of the `leaflet_admin_list_config` element
+// (see `LeafletAdminListMixin.get_map_config`), the feature list shown on the page is the JSON text of the
+// `leaflet_admin_list_geojson` element.
+django.jQuery(
+function () {
+    function loadmap(config) {
+        var messages = config.messages;
+        map = L.map('leaflet_admin_list_map', {
+            maxZoom: 19,
+            preferCanvas: config.geojson_render != 'dom',
+            maxBounds: [[-90, -180], [90, 180]],
+            zoomControl: false,
+            attributionControl: false,
+        });
+
+        var colors = [
+            '#ff0000', '#800000', '#191970', '#ffa500', '#0000cd', '#7cfc00', '#00fa9a', '#00ffff', '#ff00ff', '#1e90ff', '#ffff54', '#dda0dd', '#ff1493', '#ffdab9', '#2f4f4f', '#6b8e23',
+        ]
+
+        var osm = L.tileLayer('//{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+            attribution: django.jQuery('<a href="https://www.openstreetmap.org/">OSM</a>').attr('title', messages.osm)[0].outerHTML,
+            referrerPolicy: "strict-origin-when-cross-origin",
+            id: 'osm',
+        }).addTo(map);
+
+        // layers of features by the object primary key
+        var geojson_layers = {};
+        geojson = L.geoJSON(null, {
+            pointToLayer: function(point, latlng) {
+                if( point.properties.cluster ) {
+                    var size = 24 + 6 * Math.round(Math.log10(point.properties.count));
+                    var marker = L.marker(latlng, {
+                        icon: L.divIcon({
+                            html: '<div style="width: 100%; height: 100%; line-height: ' + size + 'px; text-align: center; border-radius: 50%; ' +
+                                'background: rgba(160, 160, 160, 0.8); border: 2px solid #808080; font-weight: bold;">' + point.properties.count + '</div>',
+                            className: 'leaflet_admin_list_cluster',
+                            iconSize: [size, size],
+                        }),
+                    });
+                    marker.on('click', function() {
+                        var bb = point.properties.bbox;
+                        var bounds = L.latLngBounds([bb[1], bb[0]], [bb[3], bb[2]]);
+                        if( bounds.getNorthEast().equals(bounds.getSouthWest()) ) {
+                            map.setView(latlng, map.getZoom() + 2);
+                        } else {
+                            map.fitBounds(bounds);
+                        }
+                    });
+                    return marker;
+                }
+                var point_style = point.properties.point_style || {};
+                if( config.geojson_render == 'dom' ) {
+                    var icon_style = point_style.icon;
+                    var options = {...point_style};
+                    options.icon = icon_style ? L.icon(icon_style) : L.Marker.prototype.options.icon;
+                    return L.marker(latlng, options);
+                }
+                // icons are not drawn on the canvas, so the point is drawn as a circle styled by the rest of the point style
+                var options = {radius: 6, ...point_style};
+                delete options.icon;
+                return L.circleMarker(latlng, options);
+            },
+            style: function(feature) {
+                return feature.properties.line_style;
+            },
+            onEachFeature: function(feature, layer) {
+                if( !feature.properties.cluster ) {
+                    (geojson_layers[feature.properties.pk] = geojson_layers[feature.properties.pk] || []).push(layer);
+                }
+                if( typeof(feature.properties.popup) != "undefined" ) {
+                    var popup = feature.properties.popup;
+                    if( popup[0] == '<' ) // >
+                        popup = django.jQuery(feature.properties.popup)[0];
+                    layer.bindPopup(popup);
+                }
+                if( typeof(feature.properties.tooltip) != "undefined" ) {
+                    var tooltip = feature.properties.tooltip;
+                    if( tooltip[0] == '<' ) // >
+                        tooltip = django.jQuery(feature.properties.tooltip)[0];
+                    layer.bindTooltip(tooltip);
+                }
+            }
+        }).addTo(map);
+        var add_features = function(features) {
+            geojson.addData({type: 'FeatureCollection', features: features});
+        };
+        var clear_features = function() {
+            geojson.clearLayers();
+            geojson_layers = {};
+        };
+        if( config.geojson_render == 'webgl' && !config.geojson_tiles_url ) {
+            // points are drawn by the WebGL layer, other features are drawn by the canvas renderer
+            L.glify.longitudeFirst();
+            var glify_layers = [];
+            var glify_color = function(index, point) {
+                var color = /^#([0-9a-f]{2})([0-9a-f]{2})([0-9a-f]{2})$/i.exec((point.properties.point_style || {}).color || '#3388ff');
+                return color ? {r: parseInt(color[1], 16) / 255, g: parseInt(color[2], 16) / 255, b: parseInt(color[3], 16) / 255} : {r: 0.2, g: 0.53, b: 1};
+            };
+            add_features = function(features) {
+                var points = [];
+                var others = [];
+                features.forEach(function(feature) {
+                    (feature.geometry.type == 'Point' && !feature.properties.cluster ? points : others).push(feature);
+                });
+                if( points.length ) {
+                    glify_layers.push(L.glify.points({
+                        map: map,
+                        data: {type: 'FeatureCollection', features: points},
+                        size: 10,
+                        color: glify_color,
+                        click: function(event, point) {
+                            var popup = point.properties.popup;
+                            if( typeof(popup) != "undefined" ) {
+                                if( popup[0] == '<' ) // >
+                                    popup = django.jQuery(popup)[0];
+                                L.popup().setLatLng(event.latlng).setContent(popup).openOn(map);
+                            }
+                        },
+                    }));
+                }
+                geojson.addData({type: 'FeatureCollection', features: others});
+            };
+            clear_features = function() {
+                geojson.clearLayers();
+                geojson_layers = {};
+                glify_layers.forEach(function(layer) {
+                    layer.remove();
+                });
+                glify_layers = [];
+            };
+        }
+        var hash = document.URL.split('#')[1];
+        // the extent of objects computed by the server positions the map before features are loaded
+        var extent = config.geojson_extent;
+        if( extent && !hash ) {
+            // the extent of a single point has no size
+            map.fitBounds([[extent[1], extent[0]], [extent[3], extent[2]]], {maxZoom: 18});
+        }
+        var fitmap = function() {
+            if( !hash && !extent ) {
+                var bounds = geojson.getBounds();
+                if (bounds.isValid()) {
+                    map.fitBounds(bounds);
+                } else {
+                    map.setView([0, 0], 1);
+                }
+            }
+        };
+        // decodes the compact feature list produced by the leaflet_admin_list.compact.CompactEncoder
+        var decode = function(js) {
+            if( js.type != 'CompactFeatureCollection' ) {
+                return js;
+            }
+            var types = [null, 'Point', 'LineString', 'Polygon', 'MultiPoint', 'MultiLineString', 'MultiPolygon', 'GeometryCollection'];
+            var depths = [null, 0, 1, 2, 1, 2, 3];
+            var scale = Math.pow(10, js.precision);
+            var x = 0, y = 0, g = null, i = 0;
+            var coordinates = function(depth) {
+                if( depth ) {
+                    var r = [];
+                    for(var n = g[i++]; n > 0; n--) {
+                        r.push(coordinates(depth - 1));
+                    }
+                    return r;
+                }
+                x += g[i++];
+                y += g[i++];
+                return [x / scale, y / scale];
+            };
+            var geometry = function() {
+                var code = g[i++];
+                if( types[code] == 'GeometryCollection' ) {
+                    var geometries = [];
+                    for(var n = g[i++]; n > 0; n--) {
+                        geometries.push(geometry());
+                    }
+                    return {type: types[code], geometries: geometries};
+                }
+                return {type: types[code], coordinates: coordinates(depths[code])};
+            };
+            var features = js.features.map(function(feature) {
+                var tags = feature[0];
+                var properties = {};
+                for(var k=0; tags.length > k; k += 2) {
+                    properties[js.keys[tags[k]]] = js.values[tags[k + 1]];
+                }
+                g = feature[1];
+                i = 0;
+                return {type: 'Feature', geometry: geometry(), properties: properties};
+            });
+            return {...js, type: 'FeatureCollection', features: features};
+        };
+        // shows times of stages producing the map data recorded by the server
+        var show_timing = function(server_timing) {};
+        // shows the time from `started` (by the performance clock) until the added features are drawn
+        var show_interactive = function(started) {};
+        if( config.geojson_timing_overlay ) {
+            var timing = L.control({position: 'topright'});
+            timing.onAdd = function() {
+                return L.DomUtil.create('div', 'leaflet-control-attribution leaflet_admin_list_timing');
+            };
+            timing.addTo(map);
+            var server_stages = [];
+            var client_stages = {};
+            var render_timing = function() {
+                var stages = server_stages.concat(Object.keys(client_stages).map(function(name) {
+                    return name + ' ' + client_stages[name];
+                }));
+                timing.getContainer().textContent = stages.join(' | ');
+            };
+            show_interactive = function(started) {
+                requestAnimationFrame(function() {
+                    client_stages.interactive = Math.round(performance.now() - started) + 'ms';
+                    render_timing();
+                });
+            };
+            // the frame rate is measured every second while the overlay is shown
+            var frames = 0;
+            var second = performance.now();
+            var count_frame = function(now) {
+                frames++;
+                if( now - second >= 1000 ) {
+                    client_stages.fps = Math.round(frames * 1000 / (now - second));
+                    render_timing();
+                    frames = 0;
+                    second = now;
+                }
+                requestAnimationFrame(count_frame);
+            };
+            requestAnimationFrame(count_frame);
+            show_timing = function(server_timing) {
+                server_stages = (server_timing || '').split(',').filter(function(stage) {
+                    return stage.trim();
+                }).map(function(stage) {
+                    var parts = stage.trim().split(';');
+                    var text = parts[0];
+                    for(var i=1; parts.length > i; i++) {
+                        if( parts[i].indexOf('dur=') == 0 ) {
+                            text += ' ' + parts[i].substring(4) + 'ms';
+                        } else if( parts[i].indexOf('desc=') == 0 ) {
+                            text += ' (' + parts[i].substring(5).replace(/"/g, '') + ')';
+                        }
+                    }
+                    return text;
+                });
+                render_timing();
+            };
+            show_timing(config.geojson_timing);
+        }
+        if( config.geojson_worker ) {
+            // parses the feature list in the Web Worker posting the feature list without features first,
+            // primary keys of its objects included, and then chunks of features
+            var worker_url = window.URL.createObjectURL(new Blob(['(' + function(decode) {
+                onmessage = function(event) {
+                    var parse = function(text, server_timing) {
+                        var js = decode(JSON.parse(text));
+                        var features = js.features;
+                        js.features = [];
+                        js.pks = features.map(function(feature) { return feature.properties.pk; });
+                        postMessage({js: js, server_timing: server_timing});
+                        for(var i=0; features.length > i; i += event.data.chunk_size) {
+                            postMessage({features: features.slice(i, i + event.data.chunk_size)});
+                        }
+                        postMessage({done: true});
+                    };
+                    if( event.data.url ) {
+                        fetch(event.data.url, {credentials: 'same-origin'}).then(function(response) {
+                            return response.text().then(function(text) {
+                                parse(text, response.headers.get('Server-Timing'));
+                            });
+                        });
+                    } else {
+                        parse(event.data.text, null);
+                    }
+                };
+            } + ')(' + decode + ');'], {type: 'text/javascript'}));
+            var worker = null;
+            var queue = [];
+            var scheduled = false;
+            var drain = function() {
+                scheduled = false;
+                if( queue.length ) {
+                    queue.shift()();
+                    schedule();
+                }
+            };
+            var schedule = function() {
+                if( !scheduled && queue.length ) {
+                    scheduled = true;
+                    requestAnimationFrame(drain);
+                }
+            };
+        }
+        // loads the feature list in the Web Worker by the `request` having either the `url` or the `text` member, calls
+        // `begin` with the feature list without features, `add` with every chunk of features in a separate animation frame,
+        // and `end` when all features have been added; the previous load is cancelled
+        var load = function(request, begin, add, end) {
+            if( worker ) {
+                worker.terminate();
+            }
+            queue.length = 0;
+            var current = worker = new Worker(worker_url);
+            current.onmessage = function(event) {
+                var data = event.data;
+                queue.push(function() {
+                    if( data.js ) {
+                        begin(data.js, data.server_timing);
+                    } else if( data.features ) {
+                        add(data.features);
+                    } else {
+                        current.terminate();
+                        worker = null;
+                        end();
+                    }
+                });
+                schedule();
+            };
+            request.chunk_size = config.geojson_worker_chunk_size;
+            current.postMessage(request);
+        };
+        var absolute_url = function(url) {
+            return new window.URL(url, document.baseURI).href;
+        };
+        if( config.geojson_tiles_url ) {
+            if( !hash && !extent ) {
+                map.setView([0, 0], 1);
+            }
+            // VectorGrid relies on the function removed from the modern Leaflet versions
+            L.DomEvent.fakeStop = L.DomEvent.fakeStop || function() { return true; };
+            var tiles_style = {
+                color: '#A0A0A0',
+                fillColor: '#A0A0A0',
+                fill: true,
+                weight: 2,
+                radius: 4,
+            };
+            var tiles_styles = {};
+            config.geojson_tiles_layers.forEach(function(name) {
+                tiles_styles[name] = tiles_style;
+            });
+            var tiles = L.vectorGrid.protobuf(config.geojson_tiles_url, {
+                rendererFactory: L.canvas.tile,
+                vectorTileLayerStyles: tiles_styles,
+                interactive: true,
+                maxZoom: 19,
+            }).addTo(map);
+            tiles.on('click', function(event) {
+                var properties = event.layer.properties;
+                var a = django.jQuery('<a><b><i></i></b></a>');
+                a.attr('href', config.geojson_change_url.replace('__pk__', properties.pk));
+                a.attr('title', messages.view_edit);
+                a.find('i').text(messages.verbose_name + ' ' + properties.pk);
+                L.popup().setLatLng(event.latlng).setContent(django.jQuery('<div>').append(a)[0]).openOn(map);
+            });
+        } else if( config.geojson_viewport ) {
+            if( !hash && !extent ) {
+                map.setView([0, 0], 1);
+            }
+            var truncated = L.control({position: 'topright'});
+            truncated.onAdd = function() {
+                var div = L.DomUtil.create('div', 'leaflet-control-attribution');
+                div.textContent = messages.truncated;
+                return div;
+            };
+            var viewport_request = null;
+            var viewport_timeout = null;
+            var geojson_version = null;
+            // starts the update by the feature list without features having primary keys of its objects in the `pks` member
+            var begin = function(js, server_timing) {
+                show_timing(server_timing);
+                if( !js.delta ) {
+                    clear_features();
+                }
+                // changed features replace all features of the object
+                var stale = (js.removed || []).concat(js.pks);
+                for(var i=0; stale.length > i; i++) {
+                    (geojson_layers[stale[i]] || []).forEach(function(layer) {
+                        geojson.removeLayer(layer);
+                    });
+                    delete geojson_layers[stale[i]];
+                }
+                geojson_version = js.version || null;
+                if( js.truncated ) {
+                    truncated.addTo(map);
+                } else {
+                    truncated.remove();
+                }
+            };
+            var onviewport = function(event) {
+                clearTimeout(viewport_timeout);
+                viewport_timeout = setTimeout(function() {
+                    if( viewport_request ) {
+                        viewport_request.abort();
+                    }
+                    var bb = map.getBounds();
+                    var bbox = [
+                        Math.max(bb.getWest(), -180.0), Math.max(bb.getSouth(), -90.0),
+                        Math.min(bb.getEast(), 180.0), Math.min(bb.getNorth(), 90.0),
+                    ].join(',');
+                    var params = {
+                        map_bbox: bbox,
+                        map_zoom: map.getZoom(),
+                    };
+                    // features drawn by the WebGL layer can't be replaced one by one
+                    if( config.geojson_delta && config.geojson_render != 'webgl' && geojson_version ) {
+                        params.map_version = geojson_version;
+                    }
+                    var started = performance.now();
+                    if( config.geojson_worker ) {
+                        load({url: absolute_url(config.geojson_url + '&' + django.jQuery.param(params))}, begin, add_features, function() {
+                            show_interactive(started);
+                        });
+                        return;
+                    }
+                    viewport_request = django.jQuery.getJSON(config.geojson_url, params, function(js, status, xhr) {
+                        viewport_request = null;
+                        js = decode(js);
+                        var features = js.features;
+                        js.pks = features.map(function(feature) { return feature.properties.pk; });
+                        begin(js, xhr.getResponseHeader('Server-Timing'));
+                        add_features(features);
+                        show_interactive(started);
+                    });
+                }, 250);
+            };
+            map.on('moveend', onviewport);
+            map.whenReady(onviewport);
+        } else if( config.geojson_url ) {
+            if( !hash && !extent ) {
+                map.setView([0, 0], 1);
+            }
+            if( config.geojson_worker ) {
+                load({url: absolute_url(config.geojson_url)}, function(js, server_timing) {
+                    show_timing(server_timing);
+                }, add_features, function() {
+                    fitmap();
+                    show_interactive(0);
+                });
+            } else {
+                django.jQuery.getJSON(config.geojson_url, function(js, status, xhr) {
+                    show_timing(xhr.getResponseHeader('Server-Timing'));
+                    add_features(decode(js).features);
+                    fitmap();
+                    show_interactive(0);
+                });
+            }
+        } else if( config.geojson_worker ) {
+            load({text: document.getElementById('leaflet_admin_list_geojson').textContent}, function(js) {}, add_features, function() {
+                fitmap();
+                show_interactive(0);
+            });
+        } else {
+            js = decode(JSON.parse(document.getElementById('leaflet_admin_list_geojson').textContent));
+
+            add_features(js.features);
+            fitmap();
+            show_interactive(0);
+        }
+
+        L.control.attribution({
+            prefix:
+                '<a title="A JS Library for interactive maps" href="https://leafletjs.com/" target="_blank">Leaflet v.'+L.version+'</a>' + ' | ' +
+                django.jQuery('<a href="https://github.com/nnseva/django-leaflet-admin-list"></a>')
+                    .attr('title', messages.version_title).text(messages.version)[0].outerHTML
+        }).addTo(map).setPosition('bottomright');
+        L.control.scale().addTo(map).setPosition('bottomleft');
+        L.control.zoom({
+            zoomInTitle: messages.zoom_in,
+            zoomOutTitle: messages.zoom_out,
+        }).addTo(map).setPosition('topleft');
+        L.control.mousePosition().addTo(map).setPosition('bottomright');
+        var URL = document.URL;
+        permalink = (new L.Control.Permalink({
+            text: messages.permalink,
+            useLocation: true,
+            useLocalStorage: false,
+        })).addTo(map).setPosition('bottomleft');
+
+        // encodes and decodes polylines the same way as the leaflet_admin_list.polyline module, coordinates are [lon, lat]
+        var polyline_encode = function(coordinates) {
+            var r = '';
+            var previous = [0, 0];
+            coordinates.forEach(function(c) {
+                [c[1], c[0]].forEach(function(value, i) {
+                    value = Math.round(value * 1e5);
+                    var delta = value - previous[i];
+                    previous[i] = value;
+                    delta = delta < 0 ? ~(delta << 1) : delta << 1;
+                    while( delta >= 0x20 ) {
+                        r += String.fromCharCode((0x20 | (delta & 0x1f)) + 63);
+                        delta >>= 5;
+                    }
+                    r += String.fromCharCode(delta + 63);
+                });
+            });
+            return r;
+        };
+        var polyline_decode = function(text) {
+            var values = [];
+            var value = 0, shift = 0;
+            for(var i=0; text.length > i; i++) {
+                var b = text.charCodeAt(i) - 63;
+                value |= (b & 0x1f) << shift;
+                shift += 5;
+                if( 0x20 > b ) {
+                    values.push(value & 1 ? ~(value >> 1) : value >> 1);
+                    value = 0;
+                    shift = 0;
+                }
+            }
+            var r = [];
+            var lat = 0, lon = 0;
+            for(var i=0; values.length > i + 1; i += 2) {
+                lat += values[i];
+                lon += values[i + 1];
+                r.push([lon / 1e5, lat / 1e5]);
+            }
+            return r;
+        };
+        var area_filters = django.jQuery('.bounding_box_filter, .polygon_filter, .distance_filter');
+        var polygon_filters = [];
+        // show the area selected by every area filter on the map and mark links selecting the area by the map
+        for(var i=0; area_filters.length > i; i++) {
+            var ul = django.jQuery(area_filters[i]);
+            var selected = ul.attr('bbox_selected');
+            var title = ul.attr('title_text');
+            var name = ul.attr('parameter_name');
+            var color = colors[i % colors.length]
+            var style = {
+                color: color,
+                fill: false,
+                weight: 1,
+            };
+            var pt = django.jQuery('<span> █</span>').attr('title', messages.bbox_color);
+            pt.css('color', color);
+            var links = ul.find('li').slice(1).find('a');
+            links.append(pt);
+            if( ul.hasClass('polygon_filter') ) {
+                if( selected ) {
+                    L.polygon(polyline_decode(selected).map(function(c) { return [c[1], c[0]]; }), style).addTo(map).bindTooltip(title);
+                }
+                polygon_filters.push({name: name, link: links.first()});
+            } else if( ul.hasClass('distance_filter') ) {
+                if( selected ) {
+                    var c = selected.split(',');
+                    L.circle([c[1], c[0]], {...style, radius: parseFloat(c[2])}).addTo(map).bindTooltip(title);
+                }
+                // links selecting the distance from the map center are resolved when they are followed
+                links.attr('distance_parameter', name);
+            } else {
+                if( selected ) {
+                    var bb = selected.split(',');
+                    L.rectangle([[bb[1], bb[0]], [bb[3],bb[2]]], style).addTo(map).bindTooltip(title);
+                }
+                // the link selecting the current map view is resolved when it is followed
+                links.first().attr('bbox_parameter', name);
+            }
+        }
+        if( polygon_filters.length ) {
+            // the polygon drawn on the map selects objects by the first polygon filter
+            map.addControl(new L.Control.Draw({
+                position: 'topleft',
+                draw: {
+                    polygon: {shapeOptions: {color: colors[0], weight: 1}},
+                    polyline: false,
+                    rectangle: false,
+                    circle: false,
+                    marker: false,
+                    circlemarker: false,
+                },
+            }));
+            map.on('draw:created', function(event) {
+                var filter = polygon_filters[0];
+                // the outline is simplified by a pixel on the screen to keep the query string short
+                var points = event.layer.getLatLngs()[0].map(function(latlng) {
+                    return map.latLngToLayerPoint(latlng);
+                });
+                var coordinates = L.LineUtil.simplify(points, 1).map(function(point) {
+                    var latlng = map.layerPointToLatLng(point);
+                    return [latlng.lng, latlng.lat];
+                });
+                update_map_state();
+                var href = filter.link.attr('href').replace(RegExp(filter.name + '=[^&#]*'), filter.name + '=' + encodeURIComponent(polyline_encode(coordinates)));
+                window.location = href.split('#')[0] + '#' + map_state.hash;
+            });
+        }
+        // the bounding box and the hash of the current map view, updated once the map has stopped moving
+        var map_state = null;
+        var map_state_timeout = null;
+        var update_map_state = function() {
+            clearTimeout(map_state_timeout);
+            map_state_timeout = null;
+            var bb = map.getBounds();
+            var c = permalink._round_point(map.getCenter());
+
+            var e = Math.min(bb.getEast(), 180.0);
+            var n = Math.min(bb.getNorth(), 85.0);
+            var w = Math.max(bb.getWest(), -180.0);
+            var s = Math.max(bb.getSouth(), -85.0);
+            var width = Math.min(e - w, 180);
+            var height = Math.min(n - s, 90);
+
+            w = c.lng - width/2;
+            e = w + width;
+            if(e > 180.0) {
+                e = 180.0;
+                w = e - width;
+            } else if(-180 > w) {
+                w = -180;
+                e = w + width;
+            }
+            s = c.lat - height/2;
+            n = s + height;
+            if(n > 85.0) {
+                n = 85.0;
+                s = n - height;
+            } else if(-85.0 > s) {
+                s = -85.0;
+                n = s + height;
+            }
+            map_state = {
+                bbox: w + ',' + s + ',' + e + ',' + n,
+                center: c.lng + ',' + c.lat,
+                hash: 'zoom=' + map.getZoom() + '&lat=' + c.lat + '&lon=' + c.lng,
+            };
+        };
+        map.on('moveend', function(event) {
+            clearTimeout(map_state_timeout);
+            map_state_timeout = setTimeout(update_map_state, 250);
+        });
+        // links of filters and pages keep the map view, they are rewritten only when pressed
+        django.jQuery(document).on('mousedown click', '#changelist-filter a, .paginator a', function(event) {
+            if( map_state_timeout || !map_state ) {
+                update_map_state();
+            }
+            var a = django.jQuery(this);
+            var href = a.attr('href');
+            if( typeof(href) == 'undefined' ) {
+                return;
+            }
+            var name = a.attr('bbox_parameter');
+            if( name ) {
+                href = href.replace(RegExp(name + '=[^&#]*'), name + '=' + map_state.bbox);
+            }
+            name = a.attr('distance_parameter');
+            if( name ) {
+                var distance = decodeURIComponent(RegExp(name + '=([^&#]*)').exec(href)[1]).split(',')[2];
+                href = href.replace(RegExp(name + '=[^&#]*'), name + '=' + map_state.center + ',' + distance);
+            }
+            a.attr('href', href.split('#')[0] + '#' + map_state.hash);
+        });
+    }
+    var config = document.getElementById('leaflet_admin_list_config');
+    if( config ) {
+        loadmap(JSON.parse(config.textContent));
+    }
+});
@@ -0,0 +1,124 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from django.dispatch import Signal
+
+
+logger = logging.getLogger(__name__)
+
+#: sent with `model_admin`, `request` and `timings` arguments when the map data for the request has been produced
+timings_recorded = Signal()
+
+
+class Timings(object):
+    '''Times and counts of stages producing the map data for the request'''
+
+    def __init__(self):
+        #: `[seconds, count]` lists by the stage name
+        self.stages = {}
+
+    def add(self, name, seconds, count=None):
+        '''adds `seconds` and `count` to the stage `name`'''
+        stage = self.stages.setdefault(name, [0.0, None])
+        stage[0] += seconds
+        if count is not None:
+            stage[1] = (stage[1] or 0) + count
+
+    def seconds(self, *names):
+        '''returns the total time of stages `names`'''
+        return sum(self.stages[name][0] for name in names if name in self.stages)
+
+    def as_dict(self):
+        '''returns a dictionary of `{'ms': ..., 'count': ...}` dictionaries by the stage name'''
+        return {name: {'ms': seconds * 1000, 'count': count} for name, (seconds, count) in self.stages.items()}
+
+    def server_timing(self):
+        '''returns the value of the `Server-Timing` header'''
+        return ', '.join(
+            '%s;dur=%.1f%s' % (name, seconds * 1000, '' if count is None else ';desc="%s"' % count)
+            for name, (seconds, count) in self.stages.items()
+        )
+
+
+def start(request):
+    '''starts recording timings for the `request`'''
+    if getattr(request, '_leaflet_admin_list_timings', None) is None:
+        request._leaflet_admin_list_timings = Timings()
+    return request._leaflet_admin_list_timings
+
+
+def get_timings(request):
+    '''returns the `Timings` instance recording the `request`, or None if it is not recorded'''
+    return getattr(request, '_leaflet_admin_list_timings', None)
+
+
+def add(request, name, seconds, count=None):
+    '''adds `seconds` and `count` to the stage `name` if the `request` is recorded'''
+    timings = get_timings(request)
+    if timings is not None:
+        timings.add(name, seconds, count)
+
+
+@contextmanager
+def stage(request, name):
+    '''records the time of the block as the stage `name` if the `request` is recorded'''
+    timings = get_timings(request)
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def measure(request, name, func, *args):
+    '''returns the result of the `func` call, recording its time and the result length as the stage `name`
+    if the `request` is recorded'''
+    timings = get_timings(request)
+    if timings is None:
+        return func(*args)
+    started = time.perf_counter()
+    r = func(*args)
+    timings.add(name, time.perf_counter() - started, len(r))
+    return r
+
+
+def encode(request, chunks):
+    '''yields `chunks` of the encoded text, recording the time spent to produce them besides other stages and the text size
+    as the `encode` stage if the `request` is recorded'''
+    timings = get_timings(request)
+    if timings is None:
+        yield from chunks
+        return
+    other = timings.seconds('query', 'features')
+    elapsed = 0.0
+    size = 0
+    chunks = iter(chunks)
+    while True:
+        started = time.perf_counter()
+        chunk = next(chunks, None)
+        elapsed += time.perf_counter() - started
+        if chunk is None:
+            break
+        size += len(chunk)
+        yield chunk
+    timings.add('encode', elapsed - (timings.seconds('query', 'features') - other), size)
+
+
+def finish(model_admin, request):
+    '''sends the `timings_recorded` signal and logs timings of the `request`, returns the `Timings` instance'''
+    timings = get_timings(request)
+    if timings is None:
+        return None
+    timings_recorded.send(sender=model_admin.__class__, model_admin=model_admin, request=request, timings=timings)
+    logger.debug('%s %s: %s', model_admin.model._meta.label, request.path, timings.server_timing())
+    return timings
+
+
+def streamed(model_admin, request, chunks):
+    '''yields `chunks` of the streamed response, finishing recording of the `request` when all chunks have been sent'''
+    yield from chunks
+    finish(model_admin, request)
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.templatetags.static import static
+
+
+#: static directory of vendored plugins
+VENDOR_DIR = 'leaflet_admin_list/vendor/'
+
+#: stylesheets of plugins used by every map, bundled into `plugins.css` when vendored
+CSS = [
+    'https://cdn.jsdelivr.net/npm/leaflet-mouse-position/src/L.Control.MousePosition.css',
+]
+
+#: scripts of plugins used by every map, bundled into `plugins.js` when vendored
+JS = [
+    'https://cdn.jsdelivr.net/npm/leaflet-mouse-position/src/L.Control.MousePosition.js',
+    'https://cdnjs.cloudflare.com/ajax/libs/leaflet-plugins/3.3.1/control/Permalink.min.js',
+    'https://cdnjs.cloudflare.com/ajax/libs/Colors.js/1.2.4/colors.min.js',
+]
+
+#: scripts of plugins used by some maps only, by the file name when vendored
+OPTIONAL = {
+    'Leaflet.VectorGrid.bundled.js': 'https://unpkg.com/leaflet.vectorgrid@1.3.0/dist/Leaflet.VectorGrid.bundled.js',
+    'glify-browser.js': 'https://unpkg.com/leaflet.glify@3.2.0/dist/glify-browser.js',
+}
+
+
+def is_vendored():
+    '''returns True if plugins are served as static files made by the `leaflet_admin_list_vendor` command'''
+    return getattr(settings, 'LEAFLET_ADMIN_LIST_VENDOR', False)
+
+
+def css():
+    '''returns stylesheets of plugins used by every map'''
+    return [VENDOR_DIR + 'plugins.css'] if is_vendored() else list(CSS)
+
+
+def js():
+    '''returns scripts of plugins used by every map'''
+    return [VENDOR_DIR + 'plugins.js'] if is_vendored() else list(JS)
+
+
+def optional_url(name):
+    '''returns the URL of the script of the optional plugin `name`'''
+    return static(VENDOR_DIR + name) if is_vendored() else OPTIONAL[name]
@@ -0,0 +1,43 @@
+import functools
+
+from django.contrib.admin.views.main import ChangeList
+from django.utils.translation import gettext as _
+
+
+class LeafletChangeList(ChangeList):
+    '''Changelist sharing the page queryset between the list and the map'''
+
+    def get_results(self, request):
+        if getattr(request, '_leaflet_admin_list_unpaged', False):
+            # views serving only the map use the filtered queryset as a whole, the page and counters are never shown
+            self.result_count_note = None
+            return
+        super().get_results(request)
+        #: explains the number of objects if it is not exact, see `leaflet_admin_list.paginator.EstimatedPaginator`
+        self.result_count_note = None
+        if getattr(self.paginator, 'estimated', False):
+            self.result_count_note = _('The number of %(name)s is estimated') % {'name': self.opts.verbose_name_plural}
+        elif getattr(self.paginator, 'capped', False):
+            self.result_count_note = _('More than %(count)s %(name)s') % {
+                'count': self.paginator.threshold, 'name': self.opts.verbose_name_plural,
+            }
+        if not getattr(request, '_leaflet_admin_list_inline', False):
+            # the map doesn't show the page, separate views prepare their own queries
+            return
+        annotations = self.model_admin.get_geojson_annotations(request, self.result_list)
+        if annotations:
+            self.result_list = self.result_list.annotate(**annotations)
+        # the map shown inside the changelist page uses related objects of the same page
+        select_related, prefetch_related = self.model_admin.get_geojson_related(request)
+        if select_related:
+            self.result_list = self.result_list.select_related(*select_related)
+        if prefetch_related:
+            self.result_list = self.result_list.prefetch_related(*prefetch_related)
+
+
+@functools.lru_cache(maxsize=None)
+def leaflet_changelist(changelist):
+    '''returns the subclass of the `changelist` class sharing the page queryset between the list and the map'''
+    if issubclass(changelist, LeafletChangeList):
+        return changelist
+    return type('Leaflet%s' % changelist.__name__, (LeafletChangeList, changelist), {'__module__': changelist.__module__})
@@ -33,11 +33,12 @@ setup(
     ],
     keywords="django admin leaflet map list view",
     license='LGPL',
-    packages=['leaflet_admin_list'],
+    packages=['leaflet_admin_list', 'leaflet_admin_list.management', 'leaflet_admin_list.management.commands'],
     package_data={
         'leaflet_admin_list': [
             'templates/leaflet_admin_list/leaflet_admin_filter.html',
             'templates/leaflet_admin_list/leaflet_admin_list.html',
+            'static/leaflet_admin_list/leaflet_admin_list.js',
         ]
     },
     include_package_data=True,